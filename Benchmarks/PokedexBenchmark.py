@@ -0,0 +1,296 @@
+# Headless benchmarks for every PokedexDB method and PokedexApp event handler.
+#
+# Handlers run against a stub ViewerTab and an image cache that keeps raw bytes instead of decoding them,
+# so no display is needed. Results can be written as JSON and compared against a stored baseline.
+#
+# Usage (from the repository root):
+#   python -m Benchmarks.PokedexBenchmark --output results.json
+#   python -m Benchmarks.PokedexBenchmark --baseline results.json --tolerance 0.25
+
+# Python Libraries
+import json
+import platform
+import random
+import sqlite3
+import sys
+from argparse import ArgumentParser, Namespace
+from math import ceil
+from time import perf_counter
+from typing import Callable, Optional
+
+# Local Libraries
+from DB.DexSnapshot import DexSnapshot
+from DB.PokedexDB import PokedexDB
+from PyPokedex import PokedexApp
+from UI.DBWorker import DBWorker
+from UI.ImageCache import ImageCache
+from UI.Prefetcher import Prefetcher
+
+# Global Declarations
+ITERATIONS: int = 200  # Timed calls per benchmark
+WARMUP: int = 5  # Untimed calls per benchmark
+PREFETCH_WINDOW: int = 5
+PERCENTILES: tuple = (50, 95, 99)
+
+
+# Stand-in for the Tk IntVar behind the shiny checkbox.
+class _Var:
+    def __init__(self, value: int = 0) -> None:
+        self.value: int = value
+
+    def get(self) -> int:
+        return self.value
+
+    def set(self, value: int) -> None:
+        self.value = value
+
+
+# Stand-in for ViewerTab: holds the selection the handlers read and ignores refresh_* calls.
+class StubViewerTab:
+    def __init__(self, game: str, dex: str) -> None:
+        self.game: str = game
+        self.dex: str = dex
+        self.national_dex_id: int = 0
+        self.pokemon_id: int = 0
+        self.neighbors: list = []
+        self.shiny: _Var = _Var()
+        self.stat_level: int = 0
+        self.full_text_search: Optional[Callable] = None
+
+    def get_game(self) -> str:
+        return self.game
+
+    def get_dex(self) -> str:
+        return self.dex
+
+    def get_national_dex_id(self) -> int:
+        return self.national_dex_id
+
+    def get_pokemon_id(self) -> int:
+        return self.pokemon_id
+
+    def get_neighbor_national_dex_ids(self, count: int) -> list:
+        return self.neighbors[:count * 2]
+
+    def get_stat_level(self) -> int:
+        return self.stat_level
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith("refresh_"):
+            return lambda *args: None
+        raise AttributeError(name)
+
+
+# ImageCache that stores raw bytes, since decoding a PhotoImage needs a display.
+class HeadlessImageCache(ImageCache):
+    def decode(self, icon_data: bytes) -> tuple:
+        if isinstance(icon_data, memoryview):
+            icon_data = icon_data.tobytes()
+        return icon_data, len(icon_data or b"")  # None (no image) decodes to an empty image
+
+
+# Return the p-th percentile (nearest rank) of sorted samples.
+def percentile(samples: list, p: float) -> float:
+    index: int = max(0, min(len(samples) - 1, ceil(p / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+# Time call() iterations times, running setup() untimed before each call. Returns a result dict (milliseconds).
+def measure(name: str, call: Callable, iterations: int = ITERATIONS, setup: Optional[Callable] = None) -> dict:
+    for _ in range(WARMUP):
+        if setup:
+            setup()
+        call()
+
+    samples: list = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start: float = perf_counter()
+        call()
+        samples.append((perf_counter() - start) * 1000)
+    samples.sort()
+
+    result: dict = {"name": name, "iterations": iterations, "mean_ms": sum(samples) / len(samples)}
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = percentile(samples, p)
+    result["ops_per_s"] = 1000 / result["mean_ms"] if result["mean_ms"] else float("inf")
+    return result
+
+
+# Create a headless PokedexApp for game/dex, wired to a stub viewer and a synchronous worker.
+def create_app(db: PokedexDB, game: str, dex: str) -> PokedexApp:
+    app: PokedexApp = PokedexApp(db, start=False)
+    app.viewer_tab = StubViewerTab(game, dex)
+    app.image_cache = HeadlessImageCache()
+    app.worker = DBWorker()
+    app.prefetcher = Prefetcher(app.worker, app.image_cache, app.fetch_icons, PREFETCH_WINDOW)
+    app.on_dex_changed()
+    return app
+
+
+# Benchmark each PokedexDB method, cycling through Pokémon of the passed game/dex.
+def run_db_benchmarks(db: PokedexDB, game: str, dex: str, iterations: int, rng: random.Random) -> list:
+    snapshot: DexSnapshot = db.load_dex(game, dex)
+    forms: list = [form for national_dex_id, _, _ in snapshot.pokemon for form in snapshot.get_forms(national_dex_id)]
+    national_dex_ids: list = [values[0] for values in snapshot.pokemon]
+    names: list = [values[2] for values in snapshot.pokemon]
+
+    def header(index: int) -> list:
+        return snapshot.get_header(forms[index % len(forms)][0])
+
+    def cycle(func: Callable) -> Callable:
+        order: list = list(range(len(forms)))
+        rng.shuffle(order)
+        calls: list = [0]
+
+        def call() -> None:
+            func(order[calls[0] % len(order)])
+            calls[0] += 1
+        return call
+
+    # Warm variants of cached methods cycle over a few IDs loaded up front, so every timed call is a cache hit.
+    warm_ids: list = national_dex_ids[:WARMUP]
+    for national_dex_id in warm_ids:
+        db.get_species_history(national_dex_id)
+
+    benchmarks: list = [
+        ("db.get_games", lambda: db.get_games()),
+        ("db.get_dexes", lambda: db.get_dexes(game)),
+        ("db.load_dex", lambda: db.load_dex(game, dex)),
+        ("db.get_pokedex_headers", lambda: db.get_pokedex_headers(game, dex)),
+        ("db.get_pokemon", lambda: db.get_pokemon(game, dex)),
+        ("db.get_forms", cycle(lambda i: db.get_forms(game, dex, national_dex_ids[i % len(national_dex_ids)]))),
+        ("db.get_type_icons", cycle(lambda i: db.get_type_icons(header(i)[0]))),
+        ("db.get_stats", cycle(lambda i: db.get_stats(header(i)[1]))),
+        ("db.get_stat_columns", lambda: db.get_stat_columns(game, dex)),
+        ("db.calculate_stats", lambda: db.calculate_stats(game, dex, 100)),
+        ("db.get_abilities", cycle(lambda i: db.get_abilities(header(i)[2]))),
+        ("db.get_max_stats (warm)", lambda: db.get_max_stats(snapshot.game_id)),
+        ("db.get_portrait_icon", cycle(lambda i: db.get_portrait_icon(forms[i][0], bool(i % 2)))),
+        ("db.search", cycle(lambda i: db.search(names[i % len(names)][:3]))),
+        ("db.get_species_history (warm)", cycle(lambda i: db.get_species_history(warm_ids[i % len(warm_ids)]))),
+    ]
+
+    # Cached methods are timed cold too, with their cache dropped before each call.
+    def clear_max_stats() -> None:
+        db._max_stats = None
+
+    def clear_species_history() -> None:
+        db._species_history = {}
+
+    cold_benchmarks: list = [
+        ("db.get_max_stats (cold)", lambda: db.get_max_stats(snapshot.game_id), clear_max_stats),
+        ("db.get_species_history (cold)",
+         cycle(lambda i: db.get_species_history(national_dex_ids[i % len(national_dex_ids)])), clear_species_history),
+    ]
+    return [measure(name, call, iterations) for name, call in benchmarks] + \
+        [measure(name, call, iterations, setup) for name, call, setup in cold_benchmarks]
+
+
+# Benchmark the composite PokedexApp handler paths against game/dex.
+def run_handler_benchmarks(db: PokedexDB, game: str, dex: str, iterations: int, rng: random.Random) -> list:
+    app: PokedexApp = create_app(db, game, dex)
+    viewer: StubViewerTab = app.viewer_tab
+    national_dex_ids: list = [values[0] for values in app.snapshot.pokemon]
+
+    def select_pokemon() -> None:
+        index: int = rng.randrange(len(national_dex_ids))
+        viewer.national_dex_id = national_dex_ids[index]
+        viewer.neighbors = national_dex_ids[index + 1:index + 1 + PREFETCH_WINDOW] + \
+            national_dex_ids[max(0, index - PREFETCH_WINDOW):index]
+        viewer.pokemon_id = app.snapshot.get_forms(viewer.national_dex_id)[0][0]
+
+    def select_cold() -> None:
+        select_pokemon()
+        app.image_cache.clear()
+
+    def select_warm() -> None:
+        select_pokemon()
+        app.on_form_changed(None)
+
+    def toggle_shiny() -> None:
+        viewer.shiny.set(1 - viewer.shiny.get())
+
+    return [
+        measure("app.on_dex_changed", app.on_dex_changed, iterations),
+        measure("app.on_pokemon_changed", lambda: app.on_pokemon_changed(None), iterations, select_cold),
+        measure("app.on_form_changed (cold)", lambda: app.on_form_changed(None), iterations, select_cold),
+        measure("app.on_form_changed (warm)", lambda: app.on_form_changed(None), iterations, select_warm),
+        measure("app.on_shiny_changed", app.on_shiny_changed, iterations, toggle_shiny),
+    ]
+
+
+# Compare results against baseline results, returning (name, change) for each p50 slower than tolerance.
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    baseline_by_name: dict = {result["name"]: result for result in baseline}
+    regressions: list = []
+    for result in results:
+        previous: Optional[dict] = baseline_by_name.get(result["name"])
+        if not previous or not previous["p50_ms"]:
+            continue
+        change: float = result["p50_ms"] / previous["p50_ms"] - 1
+        result["p50_change"] = change
+        if change > tolerance:
+            regressions.append((result["name"], change))
+    return regressions
+
+
+def print_results(results: list) -> None:
+    print(f"{'benchmark':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}{'vs base':>10}")
+    for result in results:
+        change: str = f"{result['p50_change']:+.0%}" if "p50_change" in result else ""
+        print(f"{result['name']:<30}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+              f"{result['p99_ms']:>10.3f}{result['ops_per_s']:>12.0f}{change:>10}")
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser: ArgumentParser = ArgumentParser(
+        prog="python -m Benchmarks.PokedexBenchmark",
+        description="Benchmark PokedexDB methods and viewer event handlers without a display."
+    )
+    parser.add_argument("--database", help="path to a PokedexDB.sqlite3 file")
+    parser.add_argument("--game", help="game to benchmark (default: the first game)")
+    parser.add_argument("--dex", help="dex to benchmark (default: the game's largest dex)")
+    parser.add_argument("--sprite-pack", action="store_true", help="read icons from the memory-mapped sprite pack")
+    parser.add_argument("--in-memory", action="store_true", help="serve reads from an in-memory replica")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results from this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown vs baseline (0.2 = 20%%)")
+    args: Namespace = parser.parse_args(argv)
+
+    rng: random.Random = random.Random(args.seed)
+    with PokedexDB(args.database, args.sprite_pack, args.in_memory) as db:
+        db.refresh_replica()  # Reads stay on disk until the replica is first copied
+        game: str = args.game or db.get_games()[0]
+        dex: str = args.dex or max(db.get_dexes(game), key=lambda name: len(db.get_pokemon(game, name)))
+        results: list = run_db_benchmarks(db, game, dex, args.iterations, rng)
+        results += run_handler_benchmarks(db, game, dex, args.iterations, rng)
+
+    regressions: list = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file)["results"], args.tolerance)
+
+    print(f"{game} / {dex}")
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({
+                "game": game,
+                "dex": dex,
+                "seed": args.seed,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "results": results
+            }, output_file, indent=2)
+
+    for name, change in regressions:
+        print(f"REGRESSION {name}: p50 {change:+.0%}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
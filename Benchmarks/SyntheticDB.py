@@ -0,0 +1,319 @@
+# Deterministic generator of synthetic, schema-compatible Pokédex databases for load and scaling tests.
+#
+# A scale of 1 approximates the real PokedexDB (1025 species, ~1300 forms, 24 games). Higher scales
+# multiply the number of games, and with them every dex, dex entry and stat set; forms per species and
+# dexes per game can be raised separately. The same seed always produces the same database.
+#
+# Usage (from the repository root):
+#   python -m Benchmarks.SyntheticDB --scale 10 --seed 1 --output /tmp/PokedexDB_10x.sqlite3
+#   python -m Benchmarks.PokedexBenchmark --database /tmp/PokedexDB_10x.sqlite3
+
+# Python Libraries
+import random
+import sqlite3
+import struct
+import zlib
+from argparse import ArgumentParser, Namespace
+from os import remove
+from os.path import exists
+from time import perf_counter
+from typing import Iterator, Optional
+
+# Global Declarations
+SPECIES: int = 1025
+GENERATION_ENDS: tuple = (151, 251, 386, 493, 649, 721, 809, 905, 1025)  # Last national dex ID per generation
+BASE_GAMES: int = 24  # Games at scale 1, spread evenly over the generations
+EXTRA_FORM_RATE: float = 0.27  # Chance of each additional form per species at scale 1
+REGIONAL_DEX_SHARE: float = 0.4  # Share of available species in a regional dex
+NATIONAL_DEX_RATE: float = 0.5  # Chance a game also has a National Dex
+CHANGE_RATE: float = 0.05  # Chance a form's stats, types or abilities change from one game to the next
+SHARED_SPRITE_RATE: float = 0.2  # Chance an extra (cosmetic) form reuses its base form's sprites
+ABILITIES: int = 310
+PORTRAIT_SIZE: int = 96  # Portrait sprites are PORTRAIT_SIZE x PORTRAIT_SIZE RGBA
+TYPE_ICON_SIZE: tuple = (32, 14)
+BATCH_SIZE: int = 10000  # Rows per executemany batch
+PALETTE: bytes = bytes(value & 0xF0 for value in range(256))  # Byte translation that limits sprite colours
+TYPES: tuple = (
+    "None", "Normal", "Fire", "Water", "Grass", "Electric", "Ice", "Fighting", "Poison", "Ground",
+    "Flying", "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy"
+)
+FORM_NAMES: tuple = ("Alolan Form", "Galarian Form", "Hisuian Form", "Mega", "Gigantamax", "Female")
+SYLLABLES: tuple = (
+    "pi", "ka", "chu", "bul", "ba", "saur", "char", "man", "der", "squir", "tle", "ee", "vee", "mew",
+    "gar", "dos", "lu", "gi", "ray", "qua", "za", "ron", "dra", "go", "nite", "sy", "lo", "met"
+)
+
+SCHEMA: str = """
+    create table Game (
+        GameID integer primary key,
+        GameName text not null,
+        Generation integer not null
+    );
+    create table GameDex (
+        GameDexID integer primary key,
+        GameID integer not null references Game(GameID),
+        GameDexName text not null
+    );
+    create table Pokemon (
+        PokemonID integer primary key,
+        NationalDexID integer not null,
+        FormID integer not null,
+        PokemonName text not null,
+        FormName text,
+        IconNormal blob,
+        IconShiny blob
+    );
+    create table StatSet (
+        StatSetID integer primary key,
+        HP integer, ATK integer, DEF integer, SPA integer, SPD integer, SPE integer
+    );
+    create table Type (
+        TypeID integer primary key,
+        TypeName text not null,
+        TypeIcon blob
+    );
+    create table TypeSet (
+        TypeSetID integer primary key,
+        PrimaryTypeID integer not null references Type(TypeID),
+        SecondaryTypeID integer not null references Type(TypeID)
+    );
+    create table Ability (
+        AbilityID integer primary key,
+        AbilityName text,
+        Description text
+    );
+    create table AbilitySet (
+        AbilitySetID integer primary key,
+        PrimaryAbilityID integer not null references Ability(AbilityID),
+        SecondaryAbilityID integer not null references Ability(AbilityID),
+        HiddenAbilityID integer not null references Ability(AbilityID)
+    );
+    create table PokeDex (
+        PokemonID integer not null references Pokemon(PokemonID),
+        GameDexID integer not null references GameDex(GameDexID),
+        TypeSetID integer not null references TypeSet(TypeSetID),
+        StatSetID integer not null references StatSet(StatSetID),
+        AbilitySetID integer not null references AbilitySet(AbilitySetID),
+        DexOrder integer not null
+    );
+"""
+
+
+# Return a PNG of width x height RGBA pixels: a transparent frame around a noisy sprite, which
+# compresses to roughly the size of a real sprite.
+def make_png(rng: random.Random, width: int, height: int) -> bytes:
+    margin_x: int = width // 5
+    margin_y: int = height // 5
+    blank: bytes = bytes(width * 4)
+    rows: list = []
+    for y in range(height):
+        if margin_y <= y < height - margin_y:
+            # Limited palette (high nibble only), like pixel-art sprites.
+            sprite_bytes: int = (width - 2 * margin_x) * 4
+            noise: bytes = rng.getrandbits(sprite_bytes * 8).to_bytes(sprite_bytes, "little").translate(PALETTE)
+            rows.append(b"\x00" + bytes(margin_x * 4) + noise + bytes(margin_x * 4))
+        else:
+            rows.append(b"\x00" + blank)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(b"".join(rows), 9)),
+        chunk(b"IEND", b"")
+    ))
+
+
+# Return the generation a species was introduced in.
+def get_species_generation(national_dex_id: int) -> int:
+    for generation, last_id in enumerate(GENERATION_ENDS, start=1):
+        if national_dex_id <= last_id:
+            return generation
+    return len(GENERATION_ENDS)
+
+
+# Return a pronounceable synthetic species name.
+def make_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+# Return random base stats (HP, ATK, DEF, SPA, SPD, SPE).
+def make_stats(rng: random.Random) -> tuple:
+    return tuple(max(5, min(255, int(rng.gauss(75, 28)))) for _ in range(6))
+
+
+class SyntheticDB:
+    def __init__(self, scale: float = 1, seed: int = 0, forms_per_species: Optional[float] = None,
+                 dexes_per_game: int = 1, icons: bool = True) -> None:
+        self.scale: float = scale
+        self.seed: int = seed
+        self.extra_form_rate: float = EXTRA_FORM_RATE if forms_per_species is None else forms_per_species - 1
+        self.dexes_per_game: int = dexes_per_game
+        self.icons: bool = icons
+        self.rng: random.Random = random.Random(seed)
+
+        # Filled by generate(): NationalDexID -> [PokemonID, ...], and rows written per table
+        self.species_forms: dict = {}
+        self.counts: dict = {}
+
+    # Write a new database to path, returning a dict of row counts.
+    def generate(self, path: str) -> dict:
+        conn: sqlite3.Connection = sqlite3.connect(path)
+        try:
+            conn.executescript(SCHEMA)
+            self._insert(conn, "Type", 3, self._types())
+            self._insert(conn, "Ability", 3, self._abilities())
+            self._insert(conn, "Pokemon", 7, self._pokemon())
+            self._insert_dexes(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return self.counts
+
+    def _insert(self, conn: sqlite3.Connection, table: str, columns: int, rows: Iterator[tuple]) -> None:
+        sql: str = f"insert into {table} values ({', '.join('?' * columns)})"
+        batch: list = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(sql, batch)
+                self.counts[table] = self.counts.get(table, 0) + len(batch)
+                batch = []
+        conn.executemany(sql, batch)
+        self.counts[table] = self.counts.get(table, 0) + len(batch)
+
+    def _types(self) -> Iterator[tuple]:
+        for type_id, type_name in enumerate(TYPES):
+            yield type_id, type_name, self._icon(*TYPE_ICON_SIZE)
+
+    def _abilities(self) -> Iterator[tuple]:
+        # AbilityID 0 is the empty slot, shown as 'N/A' by the viewer.
+        yield 0, None, None
+        for ability_id in range(1, ABILITIES + 1):
+            yield ability_id, f"{make_name(self.rng)} {self.rng.choice(('Body', 'Guard', 'Force', 'Veil'))}", ""
+
+    def _pokemon(self) -> Iterator[tuple]:
+        pokemon_id: int = 0
+        for national_dex_id in range(1, SPECIES + 1):
+            name: str = make_name(self.rng)
+            form_names: list = [None]
+            while len(form_names) <= len(FORM_NAMES) and self.rng.random() < self.extra_form_rate:
+                form_names.append(FORM_NAMES[(len(form_names) - 1 + national_dex_id) % len(FORM_NAMES)])
+
+            base_icons: tuple = (None, None)
+            for form_id, form_name in enumerate(form_names, start=1):
+                pokemon_id += 1
+                if form_id > 1 and self.rng.random() < SHARED_SPRITE_RATE:
+                    icons: tuple = base_icons
+                else:
+                    icons = (self._icon(PORTRAIT_SIZE, PORTRAIT_SIZE), self._icon(PORTRAIT_SIZE, PORTRAIT_SIZE))
+                if form_id == 1:
+                    base_icons = icons
+                self.species_forms.setdefault(national_dex_id, []).append(pokemon_id)
+                yield (pokemon_id, national_dex_id, form_id, name, form_name) + icons
+
+    def _icon(self, width: int, height: int) -> Optional[bytes]:
+        return make_png(self.rng, width, height) if self.icons else None
+
+    # Games, dexes and dex entries. Each form's stat, type and ability sets carry over from game to
+    # game and only occasionally change, like the real data.
+    def _insert_dexes(self, conn: sqlite3.Connection) -> None:
+        games: int = max(1, round(BASE_GAMES * self.scale))
+        generations: int = len(GENERATION_ENDS)
+        current: dict = {}
+        stat_sets: list = []
+        type_sets: dict = {}
+        ability_sets: dict = {}
+        game_rows: list = []
+        dex_rows: list = []
+        entries: list = []
+
+        def new_type_set() -> int:
+            primary: int = self.rng.randint(1, len(TYPES) - 1)
+            secondary: int = self.rng.choice((0, 0, self.rng.randint(1, len(TYPES) - 1)))
+            key: tuple = (primary, 0 if secondary == primary else secondary)
+            return type_sets.setdefault(key, len(type_sets) + 1)
+
+        def new_ability_set() -> int:
+            key: tuple = (
+                self.rng.randint(1, ABILITIES),
+                self.rng.choice((0, self.rng.randint(1, ABILITIES))),
+                self.rng.choice((0, self.rng.randint(1, ABILITIES)))
+            )
+            return ability_sets.setdefault(key, len(ability_sets) + 1)
+
+        def new_stat_set() -> int:
+            stat_sets.append((len(stat_sets) + 1,) + make_stats(self.rng))
+            return len(stat_sets)
+
+        for game_id in range(1, games + 1):
+            generation: int = min(generations, 1 + (game_id - 1) * generations // games)
+            game_rows.append((game_id, f"Generation {generation} Game {game_id}", generation))
+            available: list = [
+                national_dex_id for national_dex_id in self.species_forms
+                if get_species_generation(national_dex_id) <= generation
+            ]
+
+            dexes: list = []
+            for regional in range(self.dexes_per_game):
+                share: int = max(1, int(len(available) * REGIONAL_DEX_SHARE))
+                dexes.append((f"Regional Pokedex {regional + 1}", sorted(self.rng.sample(available, share))))
+            if self.rng.random() < NATIONAL_DEX_RATE:
+                dexes.append(("National Pokedex", available))
+
+            for dex_name, species in dexes:
+                game_dex_id: int = len(dex_rows) + 1
+                dex_rows.append((game_dex_id, game_id, dex_name))
+                for dex_order, national_dex_id in enumerate(species, start=1):
+                    for pokemon_id in self.species_forms[national_dex_id]:
+                        if pokemon_id not in current:
+                            current[pokemon_id] = [new_type_set(), new_stat_set(), new_ability_set()]
+                        elif self.rng.random() < CHANGE_RATE:
+                            changed: int = self.rng.randrange(3)
+                            current[pokemon_id][changed] = (new_type_set, new_stat_set, new_ability_set)[changed]()
+                        entries.append((pokemon_id, game_dex_id, *current[pokemon_id], dex_order))
+            if len(entries) >= BATCH_SIZE:
+                self._insert(conn, "PokeDex", 6, iter(entries))
+                entries = []
+
+        self._insert(conn, "PokeDex", 6, iter(entries))
+        self._insert(conn, "Game", 3, iter(game_rows))
+        self._insert(conn, "GameDex", 3, iter(dex_rows))
+        self._insert(conn, "StatSet", 7, iter(stat_sets))
+        self._insert(conn, "TypeSet", 3, ((set_id, *key) for key, set_id in type_sets.items()))
+        self._insert(conn, "AbilitySet", 4, ((set_id, *key) for key, set_id in ability_sets.items()))
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser: ArgumentParser = ArgumentParser(
+        prog="python -m Benchmarks.SyntheticDB",
+        description="Generate a deterministic, schema-compatible Pokédex database at a multiple of the real size."
+    )
+    parser.add_argument("--output", required=True, help="path of the database to create")
+    parser.add_argument("--scale", type=float, default=1, help="multiple of the real number of games (default 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--forms-per-species", type=float, help="average forms per species (default ~1.3)")
+    parser.add_argument("--dexes-per-game", type=int, default=1, help="regional dexes per game (default 1)")
+    parser.add_argument("--no-icons", action="store_true", help="leave icon BLOBs empty")
+    parser.add_argument("--force", action="store_true", help="overwrite an existing output file")
+    args: Namespace = parser.parse_args(argv)
+
+    if exists(args.output):
+        if not args.force:
+            parser.error(f"{args.output} already exists (use --force to overwrite)")
+        remove(args.output)
+
+    start: float = perf_counter()
+    generator: SyntheticDB = SyntheticDB(
+        args.scale, args.seed, args.forms_per_species, args.dexes_per_game, not args.no_icons
+    )
+    counts: dict = generator.generate(args.output)
+    for table, rows in counts.items():
+        print(f"{table:<12}{rows:>12,}")
+    print(f"Generated {args.output} in {perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
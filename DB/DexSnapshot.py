@@ -0,0 +1,102 @@
+# In-memory snapshot of a single game/dex, loaded by PokedexDB.load_dex()
+
+# Python Libraries
+from typing import Iterable, Optional
+
+# Local Libraries
+from DB.StatCalculator import calculate_stats
+from DB.StatColumns import StatColumns
+from DB.TypeChart import TypeChart
+
+
+class DexSnapshot:
+    def __init__(self, game: str, dex: str) -> None:
+        self.game: str = game
+        self.dex: str = dex
+        self.game_id: int = 0
+        self.generation: int = 0
+
+        # Pokémon header data, keyed by PokemonID: [TypeSetID, StatSetID, AbilitySetID, GameID]
+        self.headers: dict = {0: [0, 0, 0, 0]}
+
+        # Base forms in dex order: (NationalDexID, DexOrder, PokemonName)
+        self.pokemon: list = []
+
+        # Forms in FormID order, keyed by NationalDexID: [(PokemonID, FormName), ...]
+        self.forms: dict = {}
+
+        # Lookup tables, keyed by their set IDs.
+        self.stats: dict = {}
+        self.abilities: dict = {}
+        self.type_ids: dict = {}
+
+        # (max HP, max other stats) for the game, used to scale stat bars.
+        self.max_stats: tuple = (0, 0)
+
+        # Stats of every form in the dex as columns, used for dex-wide ranks.
+        self.stat_columns: StatColumns = StatColumns.from_rows([])
+
+        # Type matchup chart of the game's generation, and the type bitmask of every form keyed by PokemonID.
+        self.type_chart: Optional[TypeChart] = None
+        self.type_masks: dict = {}
+
+        # Actual stats of every form at a level (with perfect IVs/DVs and no EVs), keyed by level.
+        self.level_stats: dict = {}
+
+    # Add one PokeDex row from PokedexDB.load_dex() to the snapshot.
+    def add_row(self, row: tuple) -> None:
+        (pokemon_id, type_set_id, stat_set_id, ability_set_id, game_id,
+         national_dex_id, form_id, dex_order, pokemon_name, form_name,
+         primary_type_id, secondary_type_id) = row[:12]
+        stats: tuple = row[12:18]
+        abilities: tuple = row[18:21]
+
+        self.game_id = game_id
+        self.generation = row[21]
+        self.headers[pokemon_id] = [type_set_id, stat_set_id, ability_set_id, game_id]
+        if form_id == 1:
+            self.pokemon.append((national_dex_id, dex_order, pokemon_name))
+        self.forms.setdefault(national_dex_id, []).append((pokemon_id, form_name))
+        self.stats[stat_set_id] = list(stats)
+        self.abilities[ability_set_id] = abilities
+        self.type_ids[type_set_id] = (primary_type_id, secondary_type_id)
+
+    # Return a list of forms for the passed national dex ID.
+    def get_forms(self, national_dex_id: int) -> list:
+        return self.forms.get(national_dex_id, [])
+
+    # Return header data for the passed Pokémon ID.
+    def get_header(self, pokemon_id: int) -> list:
+        return self.headers.get(pokemon_id, self.headers[0])
+
+    # Return a list of Pokémon stats for the passed stat set ID.
+    def get_stats(self, stat_set_id: int) -> list:
+        return self.stats.get(stat_set_id, [0, 0, 0, 0, 0, 0])
+
+    # Return actual stats of every form at passed level, calculating them for the whole dex on first use.
+    def get_level_stats(self, level: int) -> StatColumns:
+        stats: Optional[StatColumns] = self.level_stats.get(level)
+        if stats is None:
+            stats = calculate_stats(self.stat_columns, self.generation, level)
+            self.level_stats[level] = stats
+        return stats
+
+    # Return {attacking type: multiplier} against the passed Pokémon ID.
+    def get_matchups(self, pokemon_id: int) -> dict:
+        if self.type_chart is None:
+            return {}
+        return self.type_chart.get_matchups(self.type_masks.get(pokemon_id, 0))
+
+    # Return Pokémon IDs of forms that resist every type in resists and are weak to every type in weak_to.
+    def find_forms(self, resists: Iterable[str] = (), weak_to: Iterable[str] = ()) -> list:
+        if self.type_chart is None:
+            return []
+        return self.type_chart.find(self.type_masks, resists, weak_to)
+
+    # Return tuple of ability names for the passed ability set ID.
+    def get_abilities(self, ability_set_id: int) -> tuple:
+        return self.abilities.get(ability_set_id, ("N/A", "N/A", "N/A"))
+
+    # Return (PrimaryTypeID, SecondaryTypeID) for the passed type set ID.
+    def get_type_ids(self, type_set_id: int) -> Optional[tuple]:
+        return self.type_ids.get(type_set_id)
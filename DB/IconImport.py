@@ -0,0 +1,186 @@
+# Bulk import of Pokémon portrait icons from a directory or manifest.
+#
+# PNGs are read and validated in a process pool, then written in batches, one transaction per batch.
+# Icons whose content already matches the database are skipped, so an interrupted import can simply be re-run.
+#
+# A directory holds files named <PokemonID>.png and <PokemonID>-shiny.png. A manifest is a CSV file with
+# File, PokemonID and Shiny columns; relative paths are resolved against the manifest's directory.
+#
+# Usage (from the repository root):
+#   python -m DB.IconImport --directory path/to/icons
+#   python -m DB.IconImport --manifest icons.csv --workers 4
+
+# Python Libraries
+import csv
+import re
+import struct
+import sys
+import zlib
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor
+from os import listdir
+from os.path import dirname, isabs, join
+from typing import Callable, Iterator, Optional
+
+# Local Libraries
+from DB.Migrations import hash_image
+from DB.PokedexDB import PokedexDB
+
+# Global Declarations
+BATCH_SIZE: int = 1000  # Icons written per transaction
+CHUNK_SIZE: int = 16  # Files handed to a pool worker at a time
+PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+ICON_FILE: re.Pattern = re.compile(r"^(\d+)(-shiny)?\.png$", re.IGNORECASE)
+TRUE_VALUES: tuple = ("1", "true", "yes", "y")
+
+
+# Return (path, PokemonID, shiny) for every icon file in directory.
+def scan_directory(directory: str) -> list:
+    entries: list = []
+    for name in sorted(listdir(directory)):
+        match: Optional[re.Match] = ICON_FILE.match(name)
+        if match:
+            entries.append((join(directory, name), int(match.group(1)), bool(match.group(2))))
+    return entries
+
+
+# Return (path, PokemonID, shiny) for every row of a File,PokemonID,Shiny manifest.
+def read_manifest(manifest: str) -> list:
+    entries: list = []
+    with open(manifest, newline="", encoding="utf-8") as manifest_file:
+        for row in csv.DictReader(manifest_file):
+            path: str = row["File"] if isabs(row["File"]) else join(dirname(manifest), row["File"])
+            shiny: bool = row.get("Shiny", "").strip().lower() in TRUE_VALUES
+            entries.append((path, int(row["PokemonID"]), shiny))
+    return entries
+
+
+# Raise ValueError unless data is a complete PNG: valid signature, IHDR first, chunk CRCs, image data and IEND.
+def validate_png(data: bytes) -> None:
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    offset: int = len(PNG_SIGNATURE)
+    chunk_types: list = []
+    image_data: list = []
+    while offset < len(data):
+        if offset + 8 > len(data):
+            raise ValueError("truncated chunk header")
+        length, chunk_type = struct.unpack_from(">I4s", data, offset)
+        end: int = offset + 8 + length
+        if end + 4 > len(data):
+            raise ValueError(f"truncated {chunk_type.decode('latin-1')} chunk")
+        crc: int = struct.unpack_from(">I", data, end)[0]
+        if zlib.crc32(data[offset + 4:end]) != crc:
+            raise ValueError(f"bad CRC in {chunk_type.decode('latin-1')} chunk")
+        chunk_types.append(chunk_type)
+        if chunk_type == b"IDAT":
+            image_data.append(data[offset + 8:end])
+        offset = end + 4
+        if chunk_type == b"IEND":
+            break
+
+    if not chunk_types or chunk_types[0] != b"IHDR":
+        raise ValueError("missing IHDR chunk")
+    if chunk_types[-1] != b"IEND":
+        raise ValueError("missing IEND chunk")
+    width, height = struct.unpack_from(">II", data, len(PNG_SIGNATURE) + 8)
+    if not width or not height:
+        raise ValueError("empty image")
+    if not image_data:
+        raise ValueError("missing IDAT chunk")
+    try:
+        zlib.decompress(b"".join(image_data))
+    except zlib.error as error:
+        raise ValueError(f"corrupt image data ({error})")
+
+
+# Read and validate one icon (runs in a pool worker). task is (path, PokemonID, shiny, current hash).
+# Returns (path, PokemonID, shiny, data, error); data and error are both None if the icon is unchanged.
+def load_icon(task: tuple) -> tuple:
+    path, pokemon_id, shiny, current_hash = task
+    try:
+        with open(path, "rb") as icon_file:
+            data: bytes = icon_file.read()
+        if current_hash is not None and hash_image(data) == current_hash:
+            return path, pokemon_id, shiny, None, None
+        validate_png(data)
+    except (OSError, ValueError, struct.error) as error:
+        return path, pokemon_id, shiny, None, str(error)
+    return path, pokemon_id, shiny, data, None
+
+
+# Import (path, PokemonID, shiny) entries into db, calling progress(done, total) after each file.
+# Returns a dict with the imported and skipped counts and a list of (path, error) failures.
+def import_icons(db: PokedexDB, entries: list, progress: Optional[Callable[[int, int], None]] = None,
+                 workers: Optional[int] = None, batch_size: int = BATCH_SIZE) -> dict:
+    result: dict = {"imported": 0, "skipped": 0, "failed": []}
+    current_hashes: dict = db.get_portrait_icon_hashes()
+    tasks: list = []
+    for path, pokemon_id, shiny in entries:
+        if (pokemon_id, shiny) in current_hashes:
+            tasks.append((path, pokemon_id, shiny, current_hashes[(pokemon_id, shiny)]))
+        else:
+            result["failed"].append((path, f"unknown PokemonID {pokemon_id}"))
+
+    total: int = len(entries)
+    done: int = len(result["failed"])
+    batch: list = []
+    for path, pokemon_id, shiny, data, error in _load_icons(tasks, workers):
+        done += 1
+        if error is not None:
+            result["failed"].append((path, error))
+        elif data is None:
+            result["skipped"] += 1
+        else:
+            batch.append((pokemon_id, shiny, data))
+            if len(batch) >= batch_size:
+                db.update_portrait_icons(batch)
+                result["imported"] += len(batch)
+                batch = []
+        if progress:
+            progress(done, total)
+
+    if batch:
+        db.update_portrait_icons(batch)
+        result["imported"] += len(batch)
+    return result
+
+
+# Yield load_icon() results for tasks in order, from a process pool unless workers is 1.
+def _load_icons(tasks: list, workers: Optional[int]) -> Iterator[tuple]:
+    if workers == 1 or len(tasks) <= CHUNK_SIZE:
+        yield from map(load_icon, tasks)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(load_icon, tasks, chunksize=CHUNK_SIZE)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser: ArgumentParser = ArgumentParser(
+        prog="python -m DB.IconImport",
+        description="Import Pokémon portrait icons in bulk. Re-running an import skips icons already imported."
+    )
+    parser.add_argument("--database", help="path to a PokedexDB.sqlite3 file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--directory", help="directory of <PokemonID>.png and <PokemonID>-shiny.png files")
+    source.add_argument("--manifest", help="CSV file with File, PokemonID and Shiny columns")
+    parser.add_argument("--workers", type=int, help="validation processes (default: one per CPU)")
+    args: Namespace = parser.parse_args(argv)
+
+    entries: list = scan_directory(args.directory) if args.directory else read_manifest(args.manifest)
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total}", end="", file=sys.stderr)
+
+    with PokedexDB(args.database) as db:
+        result: dict = import_icons(db, entries, report, args.workers)
+    print(file=sys.stderr)
+
+    for path, error in result["failed"]:
+        print(f"FAIL {path}: {error}", file=sys.stderr)
+    print(f"{result['imported']} imported, {result['skipped']} unchanged, {len(result['failed'])} failed")
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Opt-in latency instrumentation for PokedexDB queries, PokedexApp handlers and ViewerTab refreshes.
+#
+# Enable it by setting PYPOKEDEX_TRACE=1 before starting the app (or by calling enable() before the
+# database is opened). While disabled, @timed functions cost one flag check per call and no SQLite
+# callbacks are installed.
+
+# Python Libraries
+import atexit
+import re
+import sys
+from functools import wraps
+from os import environ
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Optional, TextIO
+
+# Global Declarations
+ENV_VAR: str = "PYPOKEDEX_TRACE"
+PROGRESS_STEPS: int = 1000  # SQLite VM instructions between progress callbacks
+STATEMENT_LENGTH: int = 80  # Characters of normalised SQL kept as the statement name
+
+_enabled: bool = False
+_stats: dict = {}  # name -> [count, total seconds, worst seconds]
+_lock: Lock = Lock()
+_literals: re.Pattern = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+# Start collecting timings, optionally dumping a report to stderr when the process exits.
+def enable(dump_on_exit: bool = True) -> None:
+    global _enabled
+    if not _enabled and dump_on_exit:
+        atexit.register(dump)
+    _enabled = True
+
+
+# Stop collecting timings. Collected stats are kept until reset().
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+# Drop every collected stat.
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+# Add one observation of seconds to the stat called name.
+def record(name: str, seconds: float = 0.0, count: int = 1) -> None:
+    with _lock:
+        stat: Optional[list] = _stats.get(name)
+        if stat is None:
+            _stats[name] = [count, seconds, seconds]
+        else:
+            stat[0] += count
+            stat[1] += seconds
+            if seconds > stat[2]:
+                stat[2] = seconds
+
+
+# Decorator recording the duration of every call under the function's qualified name
+# (e.g. "PokedexDB.load_dex") while instrumentation is enabled.
+def timed(func: Callable) -> Callable:
+    name: str = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        start: float = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, perf_counter() - start)
+    return wrapper
+
+
+# SQLite trace callback counting executed statements, with literals normalised to "?".
+def trace_statement(sql: str) -> None:
+    statement: str = _literals.sub("?", " ".join(sql.split()))[:STATEMENT_LENGTH]
+    record(f"sql: {statement}")
+
+
+# SQLite progress handler counting VM instructions, a rough measure of query work.
+def count_progress() -> int:
+    record("sqlite.vm_instructions", count=PROGRESS_STEPS)
+    return 0
+
+
+# Return collected stats as dicts, slowest total first. Times are in milliseconds.
+def get_report() -> list:
+    with _lock:
+        stats: list = [(name, *stat) for name, stat in _stats.items()]
+    report: list = [
+        {
+            "name": name,
+            "count": count,
+            "total_ms": total * 1000,
+            "mean_ms": total * 1000 / count if count else 0.0,
+            "worst_ms": worst * 1000
+        }
+        for name, count, total, worst in stats
+    ]
+    report.sort(key=lambda row: (row["total_ms"], row["count"]), reverse=True)
+    return report
+
+
+# Write the report as a table to file (stderr by default).
+def dump(file: Optional[TextIO] = None) -> None:
+    file = file or sys.stderr
+    report: list = get_report()
+    if not report:
+        return
+    print(f"{'name':<60}{'count':>10}{'total ms':>12}{'mean ms':>10}{'worst ms':>10}", file=file)
+    for row in report:
+        print(f"{row['name'][:59]:<60}{row['count']:>10}{row['total_ms']:>12.2f}"
+              f"{row['mean_ms']:>10.3f}{row['worst_ms']:>10.3f}", file=file)
+
+
+if environ.get(ENV_VAR, "") not in ("", "0"):
+    enable()
@@ -0,0 +1,133 @@
+# Versioned schema migrations, applied by PokedexDB when it opens the database.
+# The applied version is stored in the database's user_version pragma.
+
+# Python Libraries
+import sqlite3
+from hashlib import sha256
+from typing import Optional
+
+# Global Declarations
+# (version, description, script), in version order. Never edit a shipped migration; append a new one.
+MIGRATIONS: list = [
+    (1, "Index the game/dex lookups and joins used by the viewer", """
+        create index if not exists IX_Game_GameName on Game(GameName, GameID);
+        create index if not exists IX_GameDex_GameID_GameDexName on GameDex(GameID, GameDexName, GameDexID);
+        create index if not exists IX_PokeDex_GameDexID on PokeDex(
+            GameDexID, PokemonID, TypeSetID, StatSetID, AbilitySetID, DexOrder
+        );
+        create index if not exists IX_PokeDex_PokemonID on PokeDex(PokemonID, GameDexID);
+        create index if not exists IX_Pokemon_NationalDexID_FormID on Pokemon(NationalDexID, FormID);
+    """),
+    (2, "Move icon BLOBs into a content-addressed Image table referenced by ID", """
+        create table if not exists Image (
+            ImageID integer primary key,
+            Hash text not null unique,
+            Data blob not null
+        );
+        alter table Pokemon add column IconNormalImageID integer references Image(ImageID);
+        alter table Pokemon add column IconShinyImageID integer references Image(ImageID);
+        alter table Type add column TypeIconImageID integer references Image(ImageID);
+
+        insert or ignore into Image(Hash, Data)
+        select hash_image(IconNormal), IconNormal from Pokemon where IconNormal is not null
+        union all
+        select hash_image(IconShiny), IconShiny from Pokemon where IconShiny is not null
+        union all
+        select hash_image(TypeIcon), TypeIcon from Type where TypeIcon is not null;
+
+        update Pokemon
+        set IconNormalImageID = (select ImageID from Image where Hash = hash_image(Pokemon.IconNormal))
+            ,IconShinyImageID = (select ImageID from Image where Hash = hash_image(Pokemon.IconShiny));
+        update Type
+        set TypeIconImageID = (select ImageID from Image where Hash = hash_image(Type.TypeIcon));
+
+        -- The old columns stay (dropping them needs SQLite 3.35) but no longer hold data.
+        update Pokemon set IconNormal = null, IconShiny = null;
+        update Type set TypeIcon = null;
+    """),
+    (3, "Count icon writes in IconVersion, so the sprite pack can tell when it is stale", """
+        create table if not exists IconVersion (
+            Version integer not null
+        );
+        -- Start from a random 48-bit value, so packs of two different databases never share a version.
+        insert into IconVersion(Version)
+        select random() & 281474976710655
+        where not exists (select 1 from IconVersion);
+
+        create trigger if not exists IconVersionImageInsert after insert on Image begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionImageUpdate after update on Image begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionImageDelete after delete on Image begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionPokemonInsert after insert on Pokemon
+        when new.IconNormalImageID is not null or new.IconShinyImageID is not null begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionPokemonUpdate
+        after update of PokemonID, IconNormalImageID, IconShinyImageID on Pokemon begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionPokemonDelete after delete on Pokemon begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionTypeInsert after insert on Type
+        when new.TypeIconImageID is not null begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionTypeUpdate after update of TypeID, TypeIconImageID on Type begin
+            update IconVersion set Version = Version + 1;
+        end;
+        create trigger if not exists IconVersionTypeDelete after delete on Type begin
+            update IconVersion set Version = Version + 1;
+        end;
+    """),
+]
+
+# Versions that free enough space to be worth a VACUUM once applied.
+VACUUM_VERSIONS: set = {2}
+
+
+# Return the content hash an image is stored under in the Image table.
+def hash_image(data: Optional[bytes]) -> Optional[str]:
+    return sha256(data).hexdigest() if data is not None else None
+
+
+# Return the schema version the database is at.
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("pragma user_version").fetchone()[0]
+
+
+# Return the schema version the latest migration brings the database to.
+def get_latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+# Apply every migration newer than the database's schema version, each in its own transaction.
+# Returns a list of the applied versions.
+def run_migrations(conn: sqlite3.Connection) -> list:
+    conn.create_function("hash_image", 1, hash_image, deterministic=True)
+    applied: list = []
+    current: int = get_schema_version(conn)
+    for version, description, script in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.executescript(f"""
+                begin;
+                {script}
+                pragma user_version = {version};
+                commit;
+                """)
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(version)
+
+    if VACUUM_VERSIONS.intersection(applied):
+        conn.execute("vacuum")
+    return applied
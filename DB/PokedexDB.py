@@ -1,8 +1,63 @@
 # Handles database operations
 
 # Python Libraries
+import re
 import sqlite3
-from os.path import dirname
+import unicodedata
+from itertools import count
+from time import monotonic, perf_counter
+from os.path import abspath, dirname, exists, getmtime, splitext
+from threading import Lock, RLock, local
+from typing import Callable, Iterable, Iterator, Optional, Union
+from urllib.request import pathname2url
+
+# Local Libraries
+from DB.DexSnapshot import DexSnapshot
+from DB.Instrumentation import PROGRESS_STEPS, count_progress, is_enabled, timed, trace_statement
+from DB.Migrations import get_latest_version, get_schema_version, hash_image, run_migrations
+from DB.SpritePack import SpritePack, build_sprite_pack, get_icon_version, is_stale
+from DB.StatCalculator import calculate_stats
+from DB.StatColumns import StatColumns
+from DB.TypeChart import TypeChart, get_type_mask
+
+# Global Declarations
+CACHED_STATEMENTS: int = 64  # Prepared statements kept per connection
+CACHE_SIZE_KB: int = 16384  # SQLite page cache size per connection
+MMAP_SIZE: int = 256 * 1024 * 1024  # Bytes of the database file memory-mapped by each reader
+REPLICA_CHECK_INTERVAL: float = 1.0  # Seconds between checks for changes by the in-memory replica and sprite pack
+STREAM_BATCH_SIZE: int = 500  # Rows fetched at a time by streaming queries
+SEARCH_LIMIT: int = 50  # Default number of full-text search results
+HISTORY_COLUMNS: tuple = (
+    "PrimaryType", "SecondaryType", "HP", "ATK", "DEF", "SPA", "SPD", "SPE",
+    "PrimaryAbility", "SecondaryAbility", "HiddenAbility"
+)  # Data compared between games by get_species_history
+
+# Rows of the PokemonSearch full-text index (rowid = PokemonID), filtered by {where}.
+SEARCH_ROWS_SQL: str = """
+    select p.PokemonID
+        ,p.NationalDexID
+        ,p.PokemonName
+        ,ifnull(p.FormName, '')
+        ,ifnull((
+            select group_concat(AbilityName, ' ')
+            from (
+                select distinct a.AbilityName
+                from PokeDex pd
+                join AbilitySet abs on abs.AbilitySetID = pd.AbilitySetID
+                join Ability a on a.AbilityID in (abs.PrimaryAbilityID, abs.SecondaryAbilityID, abs.HiddenAbilityID)
+                where pd.PokemonID = p.PokemonID
+                    and a.AbilityName is not null
+            )
+        ), '')
+    from Pokemon p
+    {where}
+"""
+
+
+# Helper function to split text into lowercase, accent-free words, the way the full-text index tokenizes it.
+def split_search_words(text: str) -> list:
+    decomposed: str = unicodedata.normalize("NFKD", text.casefold())
+    return re.findall(r"[^\W_]+", "".join(char for char in decomposed if not unicodedata.combining(char)))
 
 
 # Helper function to convert images to binary
@@ -13,16 +68,617 @@ def image_to_blob(image_path: str) -> bytes:
     return blob
 
 
+# Helper function to collapse species history rows (PokemonID, PokemonName, FormName, GameName, GameIndex,
+# *HISTORY_COLUMNS), in form then game order, into one dict per run of consecutive games with identical data.
+def collapse_game_ranges(rows: Iterable[tuple]) -> list:
+    history: list = []
+    last_key: Optional[tuple] = None
+    for pokemon_id, pokemon_name, form_name, game_name, game_index, *data in rows:
+        key: tuple = (pokemon_id, *data)
+        if key == last_key and game_index == last_index + 1:
+            history[-1]["LastGame"] = game_name
+        else:
+            history.append({
+                "PokemonID": pokemon_id,
+                "PokemonName": pokemon_name,
+                "FormName": form_name,
+                "FirstGame": game_name,
+                "LastGame": game_name,
+                **dict(zip(HISTORY_COLUMNS, data))
+            })
+        last_key, last_index = key, game_index
+    return history
+
+
 class PokedexDB:
-    def __init__(self):
-        self._database: str = f"{dirname(__file__)}/PokedexDB.sqlite3"
+    def __init__(self, database: Optional[str] = None, sprite_pack: bool = False, in_memory: bool = False):
+        self._database: str = database or f"{dirname(__file__)}/PokedexDB.sqlite3"
+
+        # Single writer connection (which also runs migrations), shared between threads. Write transactions
+        # hold the write lock; the other lock only guards connection and cache state, so reads never wait on writes.
+        self._conn: Optional[sqlite3.Connection] = None
+        self._write_lock: RLock = RLock()
+        self._lock: RLock = RLock()
+        self._trace_callback: Optional[Callable[[str], None]] = None
+
+        # Read-only connections, one per thread, so reads never wait on the writer (the database is in WAL mode).
+        self._local: local = local()
+        self._readers: list = []
+
+        # Suffixes for temporary ID tables used by batch queries.
+        self._temp_ids: count = count(1)
+
+        # Whether the search index exists (False if SQLite lacks FTS5); None until it is first used.
+        self._search_index_ready: Optional[bool] = None
+
+        # Max stats per game and dex, computed on first use and dropped whenever stats are written.
+        self._max_stats: Optional[dict] = None
+
+        # Type matchup charts per generation, and the type bitmask of every TypeSetID, built on first use.
+        self._type_charts: dict = {}
+        self._type_set_masks: Optional[dict] = None
+
+        # Species history keyed by NationalDexID, loaded on first use and dropped whenever stats are written.
+        self._species_history: dict = {}
+
+        # Optional memory-mapped icon pack next to the database, rebuilt whenever it was built from another icon
+        # version, checked every REPLICA_CHECK_INTERVAL. Icon reads fall back to SQLite if it is disabled or
+        # cannot be written. Checks and builds run under their own lock rather than the state lock, and the
+        # current pack keeps serving reads meanwhile; a replaced pack stays mapped until its last user drops it.
+        self._use_sprite_pack: bool = sprite_pack
+        self._sprite_pack_path: str = f"{splitext(self._database)[0]}.sprites"
+        self._sprite_pack: Optional[SpritePack] = None
+        self._sprite_pack_lock: Lock = Lock()
+        self._sprite_pack_checked: float = float("-inf")
+        self._type_sets: dict = {}  # TypeSetID -> (PrimaryTypeID, SecondaryTypeID), loaded with the pack
+
+        # Optional in-memory copy of the database serving every read except icons, which stay on disk.
+        # refresh_replica() copies it again when the file's data_version or mtime changes; until the first copy,
+        # and after each of our own writes until the next one, reads go to disk. Queries on it share the state
+        # lock, since one connection serves every thread; copies are made under their own lock.
+        self._use_replica: bool = in_memory
+        self._replica: Optional[sqlite3.Connection] = None
+        self._replica_source: Optional[sqlite3.Connection] = None
+        self._replica_lock: Lock = Lock()
+        self._replica_version: tuple = ()
+        self._writes: int = 0  # Write transactions committed by this instance
+        self._replica_writes: int = 0  # Value of _writes when the replica was copied
+
+    def __enter__(self) -> "PokedexDB":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    # Open the writer connection if it is not already open, switching the database to WAL mode.
+    # A missing database file raises an error instead of being created empty.
+    def open(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                if not exists(self._database):
+                    raise sqlite3.OperationalError(f"Database not found: {self._database}")
+                self._conn = sqlite3.connect(
+                    f"file:{pathname2url(abspath(self._database))}?mode=rw",
+                    uri=True,
+                    check_same_thread=False,
+                    cached_statements=CACHED_STATEMENTS
+                )
+                # Larger page cache, and parse the schema once up front.
+                self._conn.execute(f"pragma cache_size = -{CACHE_SIZE_KB}")
+                self._conn.execute("select count(*) from sqlite_master").fetchone()
+                try:
+                    self._conn.execute("pragma journal_mode = wal").fetchone()
+                except sqlite3.OperationalError:
+                    pass  # A read-only database keeps its journal mode
+                self._apply_tracing(self._conn)
+                try:
+                    self._migrate()
+                except sqlite3.Error:
+                    self._conn.close()
+                    self._conn = None
+                    raise
+
+    # Close the writer and every reader connection. The next query will reopen them.
+    def close(self) -> None:
+        with self._replica_lock, self._write_lock, self._lock:
+            self._sprite_pack = None
+            self._type_sets = {}
+            self._close_replica()
+            for reader in self._readers:
+                reader.close()
+            self._readers = []
+            self._local = local()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # Return this thread's read-only connection, opening it on first use.
+    def _reader(self) -> sqlite3.Connection:
+        reader: Optional[sqlite3.Connection] = getattr(self._local, "reader", None)
+        if reader is None:
+            self.open()
+            reader = sqlite3.connect(
+                f"file:{pathname2url(abspath(self._database))}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=CACHED_STATEMENTS
+            )
+            reader.execute(f"pragma cache_size = -{CACHE_SIZE_KB}")
+            reader.execute(f"pragma mmap_size = {MMAP_SIZE}").fetchone()
+            reader.execute("select count(*) from sqlite_master").fetchone()
+            with self._lock:
+                self._apply_tracing(reader)
+                self._readers.append(reader)
+            self._local.reader = reader
+        return reader
+
+    # Bring the schema up to date. Queries rely on the latest schema (icon reads join Image, the sprite pack
+    # reads IconVersion), so a database that stays behind, such as a read-only or locked one, raises a clear
+    # error here instead of failing on the first query that needs a newer table.
+    def _migrate(self) -> None:
+        try:
+            run_migrations(self._conn)
+        except sqlite3.OperationalError as error:
+            raise sqlite3.OperationalError(
+                f"Could not migrate {self._database} from schema version {get_schema_version(self._conn)} "
+                f"to {get_latest_version()} ({error}). Open it once with write access."
+            ) from error
+        version: int = get_schema_version(self._conn)
+        if version < get_latest_version():
+            raise sqlite3.OperationalError(
+                f"{self._database} is at schema version {version}, but version {get_latest_version()} is needed."
+            )
+
+    # Pass every statement executed on any connection to callback, or stop tracing if None.
+    def set_trace_callback(self, callback: Optional[Callable[[str], None]]) -> None:
+        with self._lock:
+            self._trace_callback = callback
+            connections: list = self._readers + [conn for conn in (self._conn, self._replica) if conn is not None]
+            for conn in connections:
+                self._apply_tracing(conn)
+
+    # Install the trace callback on conn and, while instrumentation is enabled, the statement counter and
+    # progress handler. Nothing is installed otherwise, so untraced queries pay no callback cost.
+    def _apply_tracing(self, conn: sqlite3.Connection) -> None:
+        if is_enabled():
+            conn.set_trace_callback(self._on_statement)
+            conn.set_progress_handler(count_progress, PROGRESS_STEPS)
+        else:
+            conn.set_trace_callback(self._trace_callback)
+            conn.set_progress_handler(None, 0)
+
+    # Trace callback used while instrumentation is enabled.
+    def _on_statement(self, sql: str) -> None:
+        trace_statement(sql)
+        if self._trace_callback is not None:
+            self._trace_callback(sql)
+
+    # Return the EXPLAIN QUERY PLAN detail lines for passed statement. Unbound parameters are bound as NULL.
+    def explain_query_plan(self, sql: str) -> list:
+        params: tuple = (None,) * sql.count("?")
+        return [row[3] for row in self._reader().execute(f"explain query plan {sql}", params)]
+
+    # Returns True while the writer connection is open.
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    # Return the path of the database file.
+    def get_database_path(self) -> str:
+        return self._database
+
+    # Run a read query on the in-memory replica if it is loaded and current (unless from_disk), else on this
+    # thread's reader, and return all rows.
+    def _fetch_all(self, sql: str, params: tuple = (), from_disk: bool = False) -> list:
+        if not from_disk:
+            with self._lock:
+                replica: Optional[sqlite3.Connection] = self._get_replica()
+                if replica is not None:
+                    return replica.execute(sql, params).fetchall()
+        return self._reader().execute(sql, params).fetchall()
+
+    # Run a read query like _fetch_all() and return the first row.
+    def _fetch_one(self, sql: str, params: tuple = (), from_disk: bool = False) -> Optional[tuple]:
+        if not from_disk:
+            with self._lock:
+                replica: Optional[sqlite3.Connection] = self._get_replica()
+                if replica is not None:
+                    return replica.execute(sql, params).fetchone()
+        return self._reader().execute(sql, params).fetchone()
+
+    # Return the in-memory replica, or None if it is disabled, not copied yet, or older than our last write.
+    # Called with the lock held.
+    def _get_replica(self) -> Optional[sqlite3.Connection]:
+        if self._replica is None or self._replica_writes != self._writes:
+            return None
+        return self._replica
+
+    # Return (data_version, mtime) of the database file as seen by the replica's source connection.
+    # data_version changes whenever another connection commits; mtime also catches the file being replaced.
+    def _get_file_version(self) -> tuple:
+        return self._replica_source.execute("pragma data_version").fetchone()[0], getmtime(self._database)
+
+    # Copy the database into a new in-memory replica if there is none or the file changed since the last copy,
+    # leaving out the icon images, then swap it in. The copy is made on its own connections without the state
+    # lock, so reads carry on from disk meanwhile; call it from a background thread (the app's worker does,
+    # every REPLICA_CHECK_INTERVAL). Returns True if a new copy was swapped in.
+    @timed
+    def refresh_replica(self) -> bool:
+        if not self._use_replica:
+            return False
+        with self._replica_lock:
+            self.open()
+            if self._replica_source is None:
+                self._replica_source = sqlite3.connect(
+                    f"file:{pathname2url(abspath(self._database))}?mode=ro",
+                    uri=True,
+                    check_same_thread=False
+                )
+            with self._lock:
+                writes: int = self._writes
+                current: bool = self._get_replica() is not None
+            version: tuple = self._get_file_version()
+            if current and version == self._replica_version:
+                return False
+
+            replica: sqlite3.Connection = sqlite3.connect(
+                ":memory:",
+                check_same_thread=False,
+                cached_statements=CACHED_STATEMENTS
+            )
+            self._replica_source.backup(replica)
+            with replica:
+                replica.execute("delete from Image")
+            replica.execute("vacuum")
+
+            with self._lock:
+                self._apply_tracing(replica)
+                old_replica: Optional[sqlite3.Connection] = self._replica
+                self._replica, self._replica_version, self._replica_writes = replica, version, writes
+            # Queries on the old copy ran under the state lock, so none is still using it.
+            if old_replica is not None:
+                old_replica.close()
+            return True
+
+    # Drop the in-memory replica, so reads go to disk until refresh_replica() copies the database again.
+    def _close_replica(self) -> None:
+        with self._lock:
+            for conn in (self._replica, self._replica_source):
+                if conn is not None:
+                    conn.close()
+            self._replica = None
+            self._replica_source = None
+
+    # Count a write of ours, so reads skip the replica until refresh_replica() copies the database again.
+    def _mark_replica_stale(self) -> None:
+        with self._lock:
+            self._writes += 1
+
+    # Stream rows of a read query as dicts, fetching STREAM_BATCH_SIZE rows at a time.
+    # If national_dex_ids is passed, they are loaded into a temporary table that the query names as {ids},
+    # so a whole batch of IDs resolves in one set-based query.
+    def _stream(self, sql: str, params: tuple = (), national_dex_ids: Optional[Iterable] = None) -> Iterator[dict]:
+        reader: sqlite3.Connection = self._reader()
+        id_table: str = ""
+        if national_dex_ids is not None:
+            id_table = f"temp.QueryIDs{next(self._temp_ids)}"
+            reader.execute(f"create table {id_table} (NationalDexID integer primary key)")
+            reader.executemany(
+                f"insert or ignore into {id_table} values (?)",
+                ((int(national_dex_id),) for national_dex_id in national_dex_ids)
+            )
+            reader.commit()
+        cursor: sqlite3.Cursor = reader.execute(sql.format(ids=id_table), params)
+        columns: list = [column[0] for column in cursor.description]
+
+        try:
+            while True:
+                rows: list = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            try:
+                cursor.close()
+                if id_table:
+                    reader.execute(f"drop table if exists {id_table}")
+            except sqlite3.ProgrammingError:
+                pass  # The database was closed before the stream, which also dropped its temporary table
+
+    # Run a write statement on the writer connection inside its own transaction.
+    def _execute_write(self, sql: str, params: tuple = ()) -> None:
+        with self._write_lock:
+            self.open()
+            with self._conn:
+                self._conn.execute(sql, params)
+            self._mark_replica_stale()
+
+    # Return the sprite pack, rebuilding it first if it is stale. None if the pack is disabled.
+    # Callers keep using the returned pack even if a newer one is swapped in meanwhile.
+    def get_sprite_pack(self) -> Optional[SpritePack]:
+        with self._lock:
+            sprite_pack: Optional[SpritePack] = self._sprite_pack
+            if not self._use_sprite_pack or self._is_sprite_pack_checked():
+                return sprite_pack
+        # While another thread checks the pack, keep serving the current one instead of waiting.
+        if not self._sprite_pack_lock.acquire(blocking=sprite_pack is None):
+            return sprite_pack
+        try:
+            with self._lock:
+                if not self._use_sprite_pack or self._is_sprite_pack_checked():
+                    return self._sprite_pack  # Another thread checked it meanwhile
+            reader: sqlite3.Connection = self._reader()
+            try:
+                version: int = get_icon_version(reader)
+                if sprite_pack is None or sprite_pack.version != version:
+                    if is_stale(self._sprite_pack_path, version):
+                        build_sprite_pack(reader, self._sprite_pack_path)
+                    sprite_pack = SpritePack(self._sprite_pack_path)
+                    sprite_pack.open()
+            except (OSError, ValueError, sqlite3.OperationalError):
+                with self._lock:
+                    self._use_sprite_pack = False
+                    self._sprite_pack = None
+                return None
+            type_sets: dict = {
+                type_set_id: (primary_type_id, secondary_type_id)
+                for type_set_id, primary_type_id, secondary_type_id in self._fetch_all("""
+                    select TypeSetID
+                        ,PrimaryTypeID
+                        ,SecondaryTypeID
+                    from TypeSet
+                    """)
+            }
+            with self._lock:
+                self._sprite_pack, self._type_sets = sprite_pack, type_sets
+                self._sprite_pack_checked = monotonic()
+            return sprite_pack
+        finally:
+            self._sprite_pack_lock.release()
+
+    # Returns True if the sprite pack is open and was checked against the database within REPLICA_CHECK_INTERVAL.
+    # Called with the lock held.
+    def _is_sprite_pack_checked(self) -> bool:
+        return self._sprite_pack is not None and monotonic() < self._sprite_pack_checked + REPLICA_CHECK_INTERVAL
+
+    # Make the next icon read check the sprite pack at once (after a write of ours) instead of waiting for the
+    # interval. The current pack stays open until a rebuilt one replaces it.
+    def _expire_sprite_pack_check(self) -> None:
+        with self._lock:
+            self._sprite_pack_checked = float("-inf")
+
+    # Load every form of a game/dex, with its stats, abilities and types, into a DexSnapshot in one query.
+    @timed
+    def load_dex(self, game: str, dex: str) -> DexSnapshot:
+        snapshot: DexSnapshot = DexSnapshot(game, dex)
+        rows: list = self._fetch_all("""
+            select pd.PokemonID
+                ,pd.TypeSetID
+                ,pd.StatSetID
+                ,pd.AbilitySetID
+                ,g.GameID
+                ,p.NationalDexID
+                ,p.FormID
+                ,pd.DexOrder
+                ,p.PokemonName
+                ,p.FormName
+                ,ts.PrimaryTypeID
+                ,ts.SecondaryTypeID
+                ,ss.HP
+                ,ss.ATK
+                ,ss.DEF
+                ,ss.SPA
+                ,ss.SPD
+                ,ss.SPE
+                ,ifnull(a1.AbilityName, 'N/A') as PrimaryAbility
+                ,ifnull(a2.AbilityName, 'N/A') as SecondaryAbility
+                ,ifnull(a3.AbilityName, 'N/A') as HiddenAbility
+                ,g.Generation
+            from PokeDex pd
+            join GameDex gd on gd.GameDexID = pd.GameDexID
+            join Game g on g.GameID = gd.GameID
+            join Pokemon p on p.PokemonID = pd.PokemonID
+            left join TypeSet ts on ts.TypeSetID = pd.TypeSetID
+            left join StatSet ss on ss.StatSetID = pd.StatSetID
+            left join AbilitySet abs on abs.AbilitySetID = pd.AbilitySetID
+            left join Ability a1 on a1.AbilityID = abs.PrimaryAbilityID
+            left join Ability a2 on a2.AbilityID = abs.SecondaryAbilityID
+            left join Ability a3 on a3.AbilityID = abs.HiddenAbilityID
+            where g.GameName = ?
+                and gd.GameDexName = ?
+            order by pd.DexOrder, p.FormID
+            """, (game, dex))
+        for row in rows:
+            snapshot.add_row(row)
+        snapshot.stat_columns = StatColumns.from_rows([(row[0], *row[12:18]) for row in rows])
+        if rows:
+            snapshot.max_stats = self.get_max_stats(snapshot.game_id)
+            type_set_masks: dict = self.get_type_set_masks()
+            snapshot.type_chart = self.get_type_chart(snapshot.generation)
+            snapshot.type_masks = {row[0]: type_set_masks.get(row[1], 0) for row in rows}
+        return snapshot
+
+    # Stream every form with its types, stats and abilities, optionally limited to a game, dex
+    # and/or batch of national dex IDs. Without filters this exports the whole database.
+    def iter_forms(self, game: Optional[str] = None, dex: Optional[str] = None,
+                   national_dex_ids: Optional[Iterable] = None) -> Iterator[dict]:
+        filters: list = []
+        params: list = []
+        if game is not None:
+            filters.append("g.GameName = ?")
+            params.append(game)
+        if dex is not None:
+            filters.append("gd.GameDexName = ?")
+            params.append(dex)
+        where: str = f"where {' and '.join(filters)}" if filters else ""
+        id_join: str = ""
+        if national_dex_ids is not None:
+            id_join = "join {ids} ids on ids.NationalDexID = p.NationalDexID"
+        return self._stream(f"""
+            select g.GameName
+                ,gd.GameDexName
+                ,pd.DexOrder
+                ,p.NationalDexID
+                ,p.PokemonID
+                ,p.FormID
+                ,p.PokemonName
+                ,p.FormName
+                ,t1.TypeName as PrimaryType
+                ,t2.TypeName as SecondaryType
+                ,ss.HP
+                ,ss.ATK
+                ,ss.DEF
+                ,ss.SPA
+                ,ss.SPD
+                ,ss.SPE
+                ,ifnull(a1.AbilityName, 'N/A') as PrimaryAbility
+                ,ifnull(a2.AbilityName, 'N/A') as SecondaryAbility
+                ,ifnull(a3.AbilityName, 'N/A') as HiddenAbility
+            from PokeDex pd
+            join GameDex gd on gd.GameDexID = pd.GameDexID
+            join Game g on g.GameID = gd.GameID
+            join Pokemon p on p.PokemonID = pd.PokemonID
+            {id_join}
+            left join TypeSet ts on ts.TypeSetID = pd.TypeSetID
+            left join Type t1 on t1.TypeID = ts.PrimaryTypeID
+            left join Type t2 on t2.TypeID = ts.SecondaryTypeID
+            left join StatSet ss on ss.StatSetID = pd.StatSetID
+            left join AbilitySet abs on abs.AbilitySetID = pd.AbilitySetID
+            left join Ability a1 on a1.AbilityID = abs.PrimaryAbilityID
+            left join Ability a2 on a2.AbilityID = abs.SecondaryAbilityID
+            left join Ability a3 on a3.AbilityID = abs.HiddenAbilityID
+            {where}
+            order by g.GameID, gd.GameDexID, pd.DexOrder, p.FormID
+            """, tuple(params), national_dex_ids)
+
+    # Stream every game/dex entry of the passed national dex IDs (or of every Pokémon if None).
+    def iter_dex_entries(self, national_dex_ids: Optional[Iterable] = None) -> Iterator[dict]:
+        # Drive the query from the ID batch when there is one.
+        source: str = "Pokemon p"
+        if national_dex_ids is not None:
+            source = "{ids} ids cross join Pokemon p on p.NationalDexID = ids.NationalDexID"
+        return self._stream(f"""
+            select p.NationalDexID
+                ,p.PokemonName
+                ,g.GameName
+                ,gd.GameDexName
+                ,pd.DexOrder
+            from {source}
+            join PokeDex pd on pd.PokemonID = p.PokemonID
+            join GameDex gd on gd.GameDexID = pd.GameDexID
+            join Game g on g.GameID = gd.GameID
+            where p.FormID = 1
+            order by p.NationalDexID, g.GameID, gd.GameDexID
+            """, (), national_dex_ids)
+
+    # Return ranked full-text matches of query across Pokémon names, form names and abilities in every game.
+    # Each word is matched as a prefix, so "alo" finds Alolan forms and "levit" finds Levitate users.
+    # Returns a list of (PokemonID, NationalDexID, PokemonName, FormName, AbilityNames) tuples.
+    @timed
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list:
+        words: list = query.replace('"', " ").split()
+        if not words or not self.ensure_search_index():
+            return []
+        match: str = " ".join(f'"{word}"*' for word in words)
+        return self._fetch_all("""
+            select rowid
+                ,NationalDexID
+                ,PokemonName
+                ,FormName
+                ,AbilityNames
+            from PokemonSearch
+            where PokemonSearch match ?
+            order by rank
+            limit ?
+            """, (match, limit))
+
+    # Rebuild the full-text index from scratch, returning the time it took in seconds.
+    @timed
+    def rebuild_search_index(self) -> float:
+        start: float = perf_counter()
+        with self._write_lock:
+            self.open()
+            self._create_search_index()
+            with self._conn:
+                self._conn.execute("delete from PokemonSearch")
+                self._conn.execute(f"""
+                    insert into PokemonSearch(rowid, NationalDexID, PokemonName, FormName, AbilityNames)
+                    {SEARCH_ROWS_SQL.format(where="")}
+                    """)
+            self._mark_replica_stale()
+        return perf_counter() - start
+
+    # Build the full-text index on first use. Returns False if SQLite lacks FTS5.
+    # Once known, the answer is read under the state lock; only the one-time build takes the write lock.
+    def ensure_search_index(self) -> bool:
+        with self._lock:
+            if self._search_index_ready is not None:
+                return self._search_index_ready
+        with self._write_lock:
+            if self._search_index_ready is None:
+                self.open()
+                exists: Optional[tuple] = self._conn.execute("""
+                    select 1
+                    from sqlite_master
+                    where name = 'PokemonSearch'
+                    """).fetchone()
+                try:
+                    if not exists:
+                        self.rebuild_search_index()
+                    ready: bool = True
+                except sqlite3.OperationalError:
+                    ready = False
+                with self._lock:
+                    self._search_index_ready = ready
+            return self._search_index_ready
+
+    # Create the full-text table, plus triggers that keep rows in sync when Pokémon or their dex entries change.
+    # Edits to ability names and ability sets are picked up by rebuild_search_index().
+    def _create_search_index(self) -> None:
+        refresh: str = f"""
+            delete from PokemonSearch where rowid = {{pokemon_id}};
+            insert into PokemonSearch(rowid, NationalDexID, PokemonName, FormName, AbilityNames)
+            {SEARCH_ROWS_SQL.format(where="where p.PokemonID = {pokemon_id}")};
+        """
+        self._conn.executescript(f"""
+            create virtual table if not exists PokemonSearch using fts5(
+                NationalDexID unindexed,
+                PokemonName,
+                FormName,
+                AbilityNames,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+            create trigger if not exists PokemonSearchPokemonInsert after insert on Pokemon begin
+                {refresh.format(pokemon_id="new.PokemonID")}
+            end;
+            create trigger if not exists PokemonSearchPokemonUpdate
+            after update of NationalDexID, PokemonName, FormName on Pokemon begin
+                delete from PokemonSearch where rowid = old.PokemonID;
+                {refresh.format(pokemon_id="new.PokemonID")}
+            end;
+            create trigger if not exists PokemonSearchPokemonDelete after delete on Pokemon begin
+                delete from PokemonSearch where rowid = old.PokemonID;
+            end;
+            create trigger if not exists PokemonSearchPokeDexInsert after insert on PokeDex begin
+                {refresh.format(pokemon_id="new.PokemonID")}
+            end;
+            create trigger if not exists PokemonSearchPokeDexUpdate
+            after update of PokemonID, AbilitySetID on PokeDex begin
+                {refresh.format(pokemon_id="old.PokemonID")}
+                {refresh.format(pokemon_id="new.PokemonID")}
+            end;
+            create trigger if not exists PokemonSearchPokeDexDelete after delete on PokeDex begin
+                {refresh.format(pokemon_id="old.PokemonID")}
+            end;
+            """)
 
     # Get dict of Pokémon header data (TypeSetID, StatSetID, etc.) for passed game and dex names.
+    @timed
     def get_pokedex_headers(self, game: str, dex: str) -> dict:
         pokedex_headers: dict = {0: [0, 0, 0, 0]}
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        rows: list = self._fetch_all("""
             select pd.PokemonID
                 ,pd.TypeSetID
                 ,pd.StatSetID
@@ -34,16 +690,14 @@ class PokedexDB:
             where g.GameName = ?
                 and gd.GameDexName = ?
             """, (game, dex))
-        for pd in cursor.fetchall():
+        for pd in rows:
             pokedex_headers[pd[0]] = list(pd[1:])
-        conn.close()
         return pokedex_headers
 
     # Return a list of Pokémon base forms from the National Dex
+    @timed
     def get_pokemon(self, game: str, dex: str) -> list:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        rows: list = self._fetch_all("""
             select p.NationalDexID
                 ,pd.DexOrder
                 ,p.PokemonName
@@ -56,15 +710,26 @@ class PokedexDB:
                 and gd.GameDexName = ?
             order by pd.DexOrder, p.FormID
             """, (game, dex))
-        pokemon: list = [p for p in cursor.fetchall()]
-        conn.close()
+        pokemon: list = [p for p in rows]
         return pokemon
 
+    # Return (PokemonID, NationalDexID, name) of every form in the database, in national dex order.
+    # Form names are added to the name in brackets.
+    @timed
+    def get_all_pokemon(self) -> list:
+        rows: list = self._fetch_all("""
+            select p.PokemonID
+                ,p.NationalDexID
+                ,p.PokemonName || ifnull(' (' || p.FormName || ')', '')
+            from Pokemon p
+            order by p.NationalDexID, p.FormID
+            """)
+        return rows
+
     # Return a list of Pokémon base forms from the National Dex
+    @timed
     def get_forms(self, game: str, dex: str, national_dex_id: int) -> list:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        rows: list = self._fetch_all("""
             select p.PokemonID
                 ,p.FormName
             from Pokemon p
@@ -76,32 +741,76 @@ class PokedexDB:
                 and p.NationalDexID = ?
             order by p.FormID
             """, (game, dex, national_dex_id))
-        forms: list = [f for f in cursor.fetchall()]
-        conn.close()
+        forms: list = [f for f in rows]
         return forms
 
-    # Get byte data for a Pokémon's types.
+    # Get byte data for a Pokémon's types. Served as sprite pack slices when the pack is enabled.
+    @timed
     def get_type_icons(self, type_set_id: int) -> tuple:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
-            select t1.TypeIcon as TypeIcon1
-                ,t2.TypeIcon as TypeIcon2
+        sprite_pack: Optional[SpritePack] = self.get_sprite_pack()
+        if sprite_pack is not None:
+            with self._lock:
+                type_ids: Optional[tuple] = self._type_sets.get(type_set_id)
+            return tuple(sprite_pack.get_type_icon(type_id) for type_id in type_ids) if type_ids else None
+
+        type_icons: tuple = self._fetch_one("""
+            select i1.Data as TypeIcon1
+                ,i2.Data as TypeIcon2
             from TypeSet ts
             join Type t1 on t1.TypeID = ts.PrimaryTypeID
             join Type t2 on t2.TypeID = ts.SecondaryTypeID
+            left join Image i1 on i1.ImageID = t1.TypeIconImageID
+            left join Image i2 on i2.ImageID = t2.TypeIconImageID
             where ts.TypeSetID = ?
-            """, (type_set_id,))
-        type_icons: tuple = cursor.fetchone()
-        conn.close()
+            """, (type_set_id,), from_disk=True)
         return type_icons
 
+    # Return the type matchup chart of passed generation, building it on first use.
+    def get_type_chart(self, generation: int) -> TypeChart:
+        with self._lock:
+            type_chart: Optional[TypeChart] = self._type_charts.get(generation)
+            if type_chart is None:
+                type_chart = TypeChart(generation)
+                self._type_charts[generation] = type_chart
+            return type_chart
+
+    # Return a dict of type bitmasks (see TypeChart) keyed by TypeSetID, loading every type set on first use.
+    @timed
+    def get_type_set_masks(self) -> dict:
+        with self._lock:
+            if self._type_set_masks is None:
+                rows: list = self._fetch_all("""
+                    select ts.TypeSetID
+                        ,t1.TypeName
+                        ,t2.TypeName
+                    from TypeSet ts
+                    left join Type t1 on t1.TypeID = ts.PrimaryTypeID
+                    left join Type t2 on t2.TypeID = ts.SecondaryTypeID
+                    """)
+                self._type_set_masks = {type_set_id: get_type_mask(primary, secondary)
+                                        for type_set_id, primary, secondary in rows}
+            return self._type_set_masks
+
+    # Get byte data for a single type icon.
+    @timed
+    def get_type_icon(self, type_id: int) -> bytes:
+        sprite_pack: Optional[SpritePack] = self.get_sprite_pack()
+        if sprite_pack is not None:
+            return sprite_pack.get_type_icon(type_id)
+
+        row: tuple = self._fetch_one("""
+            select i.Data
+            from Type t
+            left join Image i on i.ImageID = t.TypeIconImageID
+            where t.TypeID = ?
+            """, (type_id,), from_disk=True)
+        return row[0]
+
     # Return a list of Pokémon stats
+    @timed
     def get_stats(self, stat_set_id: int) -> list:
         stats: list = []
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        row: tuple = self._fetch_one("""
             select HP
                 ,ATK
                 ,DEF
@@ -111,34 +820,152 @@ class PokedexDB:
             from StatSet
             where StatSetID = ?
             """, (stat_set_id,))
-        stats.extend(cursor.fetchone())
-        conn.close()
+        stats.extend(row)
 
         return stats
 
-    # Return a tuple of max Pokémon stats (max HP, max other stats)
-    def get_max_stats(self, game_id: int) -> tuple:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
-            select max(ss.HP) as MaxHP
+    # Return the stats of every form in a game/dex as a columnar block, in dex order.
+    @timed
+    def get_stat_columns(self, game: str, dex: str) -> StatColumns:
+        rows: list = self._fetch_all("""
+            select pd.PokemonID
+                ,ss.HP
+                ,ss.ATK
+                ,ss.DEF
+                ,ss.SPA
+                ,ss.SPD
+                ,ss.SPE
+            from PokeDex pd
+            join GameDex gd on gd.GameDexID = pd.GameDexID
+            join Game g on g.GameID = gd.GameID
+            join Pokemon p on p.PokemonID = pd.PokemonID
+            left join StatSet ss on ss.StatSetID = pd.StatSetID
+            where g.GameName = ?
+                and gd.GameDexName = ?
+            order by pd.DexOrder, p.FormID
+            """, (game, dex))
+        return StatColumns.from_rows(rows)
+
+    # Return actual stats of every form in a game/dex at passed level, using the game generation's formulas.
+    # ivs and evs are a value for every stat or a dict keyed by stat name (DVs and stat experience before
+    # generation 3, where nature is ignored). See StatCalculator.calculate_stats.
+    @timed
+    def calculate_stats(self, game: str, dex: str, level: int = 50, ivs: Optional[Union[int, dict]] = None,
+                        evs: Union[int, dict] = 0, nature: Optional[str] = None) -> StatColumns:
+        return calculate_stats(self.get_stat_columns(game, dex), self.get_generation(game), level, ivs, evs, nature)
+
+    # Return the generation of passed game, or 0 if there is no such game.
+    @timed
+    def get_generation(self, game: str) -> int:
+        row: Optional[tuple] = self._fetch_one("""
+            select Generation
+            from Game
+            where GameName = ?
+            """, (game,))
+        return row[0] if row else 0
+
+    # Return a tuple of max Pokémon stats (max HP, max other stats) for a game, or for one of its dexes.
+    @timed
+    def get_max_stats(self, game_id: int, game_dex_id: Optional[int] = None) -> tuple:
+        with self._lock:
+            if self._max_stats is None:
+                self._max_stats = self._load_max_stats()
+            key: tuple = (game_id, game_dex_id)
+            return self._max_stats.get(key, (0, 0))
+
+    # Compute max stats of every game and every dex in one pass. Keyed by (GameID, GameDexID),
+    # with GameDexID None for the whole game.
+    def _load_max_stats(self) -> dict:
+        rows: list = self._fetch_all("""
+            select gd.GameID
+                ,gd.GameDexID
+                ,max(ss.HP) as MaxHP
                 ,max(max(ss.ATK, ss.DEF, ss.SPA, ss.SPE)) as MaxStat
             from PokeDex as pd
             join GameDex as gd on gd.GameDexID = pd.GameDexID
             join StatSet as ss on ss.StatSetID = pd.StatSetID
-            where gd.GameID = ?
-            """, (game_id,))
-        max_stats: tuple = tuple(cursor.fetchone())
-        conn.close()
-        if max_stats == (None, None):
-            max_stats = (0, 0)
+            group by gd.GameID, gd.GameDexID
+            """)
+        max_stats: dict = {}
+        for game_id, game_dex_id, max_hp, max_stat in rows:
+            max_hp, max_stat = max_hp or 0, max_stat or 0
+            max_stats[(game_id, game_dex_id)] = (max_hp, max_stat)
+            game_max: tuple = max_stats.get((game_id, None), (0, 0))
+            max_stats[(game_id, None)] = (max(game_max[0], max_hp), max(game_max[1], max_stat))
         return max_stats
 
+    # Update a stat set, refreshing the cached max stats.
+    @timed
+    def update_stats(self, stat_set_id: int, stats: list) -> None:
+        self._execute_write("""
+            update StatSet
+            set HP = ?
+                ,ATK = ?
+                ,DEF = ?
+                ,SPA = ?
+                ,SPD = ?
+                ,SPE = ?
+            where StatSetID = ?
+            """, (*stats, stat_set_id))
+        self._invalidate_stat_caches()
+
+    # Drop data derived from StatSet, so it is recomputed on next use.
+    def _invalidate_stat_caches(self) -> None:
+        with self._lock:
+            self._max_stats = None
+            self._species_history = {}
+
+    # Return how a species' forms changed between games: one dict per form and run of consecutive games with
+    # identical types, stats and abilities (see collapse_game_ranges), in form then game order.
+    # Every form and game is read in one query, and the result is cached per species.
+    @timed
+    def get_species_history(self, national_dex_id: int) -> list:
+        with self._lock:
+            history: Optional[list] = self._species_history.get(national_dex_id)
+            if history is None:
+                # With min() as the only aggregate, SQLite takes the other columns from the game's first dex.
+                rows: list = self._fetch_all("""
+                    select p.PokemonID
+                        ,p.PokemonName
+                        ,p.FormName
+                        ,g.GameName
+                        ,(select count(*) from Game g2 where g2.GameID < g.GameID) as GameIndex
+                        ,t1.TypeName as PrimaryType
+                        ,t2.TypeName as SecondaryType
+                        ,ss.HP
+                        ,ss.ATK
+                        ,ss.DEF
+                        ,ss.SPA
+                        ,ss.SPD
+                        ,ss.SPE
+                        ,ifnull(a1.AbilityName, 'N/A') as PrimaryAbility
+                        ,ifnull(a2.AbilityName, 'N/A') as SecondaryAbility
+                        ,ifnull(a3.AbilityName, 'N/A') as HiddenAbility
+                        ,min(gd.GameDexID)
+                    from Pokemon p
+                    join PokeDex pd on pd.PokemonID = p.PokemonID
+                    join GameDex gd on gd.GameDexID = pd.GameDexID
+                    join Game g on g.GameID = gd.GameID
+                    left join TypeSet ts on ts.TypeSetID = pd.TypeSetID
+                    left join Type t1 on t1.TypeID = ts.PrimaryTypeID
+                    left join Type t2 on t2.TypeID = ts.SecondaryTypeID
+                    left join StatSet ss on ss.StatSetID = pd.StatSetID
+                    left join AbilitySet abs on abs.AbilitySetID = pd.AbilitySetID
+                    left join Ability a1 on a1.AbilityID = abs.PrimaryAbilityID
+                    left join Ability a2 on a2.AbilityID = abs.SecondaryAbilityID
+                    left join Ability a3 on a3.AbilityID = abs.HiddenAbilityID
+                    where p.NationalDexID = ?
+                    group by p.PokemonID, g.GameID
+                    order by p.FormID, p.PokemonID, g.GameID
+                    """, (national_dex_id,))
+                history = collapse_game_ranges(row[:-1] for row in rows)
+                self._species_history[national_dex_id] = history
+            return history
+
     # Return tuple of ability names for passed ability set ID.
+    @timed
     def get_abilities(self, ability_set_id: int) -> tuple:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        row: tuple = self._fetch_one("""
             select ifnull(a1.AbilityName, 'N/A') as PrimaryAbility
                 ,ifnull(a2.AbilityName, 'N/A') as SecondaryAbility
                 ,ifnull(a3.AbilityName, 'N/A') as HiddenAbility
@@ -148,72 +975,159 @@ class PokedexDB:
             join Ability a3 on a3.AbilityID = abs.HiddenAbilityID
             where abs.AbilitySetID = ?
             """, (ability_set_id,))
-        abilities: tuple = tuple(cursor.fetchone())
-        conn.close()
+        abilities: tuple = tuple(row)
 
         return abilities
 
     # Return a list of all games in the database.
+    @timed
     def get_games(self) -> list:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        rows: list = self._fetch_all("""
             select GameName
             from Game
             order by GameID
             """)
-        games: list = [game[0] for game in cursor.fetchall()]
-        conn.close()
+        games: list = [game[0] for game in rows]
         return games
 
     # Return a list of Pokedex names for a specific game.
+    @timed
     def get_dexes(self, game: str) -> list:
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute("""
+        rows: list = self._fetch_all("""
             select gd.GameDexName
             from GameDex gd
             join Game g on g.GameID = gd.GameID
             where g.GameName = ?
             order by gd.GameDexID
             """, (game,))
-        dexes: list = [dex[0] for dex in cursor.fetchall()]
-        conn.close()
+        dexes: list = [dex[0] for dex in rows]
         return dexes
 
     # Get byte data for a Pokémon's appearance
+    @timed
     def get_portrait_icon(self, pokemon_id: int, shiny: bool) -> bytes:
+        sprite_pack: Optional[SpritePack] = self.get_sprite_pack()
+        if sprite_pack is not None:
+            return sprite_pack.get_portrait_icon(pokemon_id, shiny)
+
         icon: str = ""
         if shiny:
-            icon += "IconShiny"
+            icon += "IconShinyImageID"
         else:
-            icon += "IconNormal"
-        conn = sqlite3.connect(self._database)
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            select {icon}
-            from Pokemon
-            where PokemonID = ?
-            """, (pokemon_id,))
-        img_data: bytes = cursor.fetchone()[0]
-        conn.close()
+            icon += "IconNormalImageID"
+        row: tuple = self._fetch_one(f"""
+            select i.Data
+            from Pokemon p
+            left join Image i on i.ImageID = p.{icon}
+            where p.PokemonID = ?
+            """, (pokemon_id,), from_disk=True)
+        img_data: bytes = row[0]
         return img_data
 
-    # Update byte data for a Pokémon's normal appearance
+    # Update byte data for a Pokémon's normal or shiny appearance. Identical images are stored once,
+    # and the replaced image is deleted if nothing references it any more.
+    @timed
     def update_portrait_icon(self, image_blob: bytes, pokemon_id: int, shiny: bool) -> None:
         icon: str = ""
         if shiny:
-            icon += "IconShiny"
+            icon += "IconShinyImageID"
         else:
-            icon += "IconNormal"
-        with sqlite3.connect(self._database) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"""
-                update Pokemon
-                set {icon} = ?
-                where PokemonID = ?
-                """, (image_blob, pokemon_id))
-            conn.commit()
+            icon += "IconNormalImageID"
+        with self._write_lock:
+            self.open()
+            with self._conn:
+                old_image: Optional[tuple] = self._conn.execute(f"""
+                    select {icon}
+                    from Pokemon
+                    where PokemonID = ?
+                    """, (pokemon_id,)).fetchone()
+                image_id: int = self._store_image(image_blob)
+                self._conn.execute(f"""
+                    update Pokemon
+                    set {icon} = ?
+                    where PokemonID = ?
+                    """, (image_id, pokemon_id))
+                if old_image and old_image[0] not in (None, image_id):
+                    self._delete_unused_image(old_image[0])
+            self._expire_sprite_pack_check()
+
+    # Return {(PokemonID, shiny): content hash or None} for both portraits of every Pokémon.
+    def get_portrait_icon_hashes(self) -> dict:
+        rows: list = self._fetch_all("""
+            select p.PokemonID
+                ,i1.Hash as IconNormalHash
+                ,i2.Hash as IconShinyHash
+            from Pokemon p
+            left join Image i1 on i1.ImageID = p.IconNormalImageID
+            left join Image i2 on i2.ImageID = p.IconShinyImageID
+            """, from_disk=True)
+        hashes: dict = {}
+        for pokemon_id, normal_hash, shiny_hash in rows:
+            hashes[(pokemon_id, False)] = normal_hash
+            hashes[(pokemon_id, True)] = shiny_hash
+        return hashes
+
+    # Update many portraits at once from (PokemonID, shiny, image bytes) tuples, in a single transaction.
+    # Identical images are stored once, and images no longer referenced afterwards are deleted.
+    @timed
+    def update_portrait_icons(self, icons: Iterable[tuple]) -> None:
+        rows: list = [(pokemon_id, bool(shiny), hash_image(image_blob), image_blob)
+                      for pokemon_id, shiny, image_blob in icons]
+        with self._write_lock:
+            self.open()
+            with self._conn:
+                self._conn.executemany("""
+                    insert or ignore into Image(Hash, Data)
+                    values (?, ?)
+                    """, ((image_hash, image_blob) for _, _, image_hash, image_blob in rows))
+                for shiny, icon in ((False, "IconNormalImageID"), (True, "IconShinyImageID")):
+                    self._conn.executemany(f"""
+                        update Pokemon
+                        set {icon} = (select ImageID from Image where Hash = ?)
+                        where PokemonID = ?
+                        """, [(image_hash, pokemon_id)
+                              for pokemon_id, row_shiny, image_hash, _ in rows if row_shiny == shiny])
+                self._conn.execute("""
+                    delete from Image
+                    where ImageID not in (
+                        select IconNormalImageID from Pokemon where IconNormalImageID is not null
+                        union
+                        select IconShinyImageID from Pokemon where IconShinyImageID is not null
+                        union
+                        select TypeIconImageID from Type where TypeIconImageID is not null
+                    )
+                    """)
+            self._expire_sprite_pack_check()
+
+    # Store image bytes in the Image table, returning the ID of the new or already stored identical image.
+    @timed
+    def store_image(self, image_blob: bytes) -> int:
+        with self._write_lock:
+            self.open()
+            with self._conn:
+                return self._store_image(image_blob)
+
+    # Insert image bytes unless an image with the same hash exists, inside the caller's transaction.
+    def _store_image(self, image_blob: bytes) -> int:
+        image_hash: str = hash_image(image_blob)
+        self._conn.execute("""
+            insert or ignore into Image(Hash, Data)
+            values (?, ?)
+            """, (image_hash, image_blob))
+        return self._conn.execute("""
+            select ImageID
+            from Image
+            where Hash = ?
+            """, (image_hash,)).fetchone()[0]
+
+    # Delete an image no Pokémon or type references, inside the caller's transaction.
+    def _delete_unused_image(self, image_id: int) -> None:
+        self._conn.execute("""
+            delete from Image
+            where ImageID = ?
+                and not exists (select 1 from Pokemon where ? in (IconNormalImageID, IconShinyImageID))
+                and not exists (select 1 from Type where TypeIconImageID = ?)
+            """, (image_id, image_id, image_id))
 
 
 # Update byte data for a Pokémon's normal appearance
@@ -0,0 +1,132 @@
+# Headless batch queries against PokedexDB, streamed as JSON Lines or CSV.
+#
+# Usage (from the repository root):
+#   python -m DB.PokedexQuery forms --game "Red/Blue/Yellow" --dex "Kanto Pokedex"
+#   python -m DB.PokedexQuery forms --format csv 1 4 7 > starters.csv
+#   python -m DB.PokedexQuery entries - < national_dex_ids.txt
+
+# Python Libraries
+import csv
+import json
+import os
+import sqlite3
+import sys
+from argparse import ArgumentParser, Namespace
+from io import StringIO
+from typing import Iterable, Iterator, Optional, TextIO
+
+# Local Libraries
+from DB.PokedexDB import PokedexDB
+
+# Global Declarations
+MAX_LISTED_IDS: int = 10  # Unknown national dex IDs named in an error
+
+
+# Yield national dex IDs from passed arguments, reading whitespace/comma separated IDs from stdin for "-".
+# Raises ValueError naming the first value that is not a number.
+def read_ids(args: list, stdin: TextIO) -> Iterator[int]:
+    for arg in args:
+        values: Iterable[str] = (
+            value for line in stdin for value in line.replace(",", " ").split()
+        ) if arg == "-" else (arg,)
+        for value in values:
+            try:
+                yield int(value)
+            except ValueError:
+                raise ValueError(f"invalid national dex ID: {value!r}") from None
+
+
+# Return an error naming the game, dex or national dex IDs asked for that db does not have, or None.
+def find_unknown(db: PokedexDB, game: Optional[str], dex: Optional[str],
+                 national_dex_ids: Optional[list]) -> Optional[str]:
+    games: list = db.get_games()
+    if game is not None and game not in games:
+        return f"unknown game: {game!r}"
+    if dex is not None and dex not in (db.get_dexes(game) if game is not None else
+                                       [name for each_game in games for name in db.get_dexes(each_game)]):
+        return f"unknown dex: {dex!r}" + (f" in {game!r}" if game is not None else "")
+    if national_dex_ids:
+        known: set = {national_dex_id for _, national_dex_id, _ in db.get_all_pokemon()}
+        unknown: list = [national_dex_id for national_dex_id in national_dex_ids if national_dex_id not in known]
+        if unknown:
+            return f"unknown national dex ID(s): {', '.join(map(str, unknown[:MAX_LISTED_IDS]))}"
+    return None
+
+
+# Yield each row as a line of JSON.
+def to_json_lines(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+# Yield each row as a line of CSV, preceded by a header line.
+def to_csv_lines(rows: Iterable[dict]) -> Iterator[str]:
+    buffer: StringIO = StringIO()
+    writer: Optional[csv.DictWriter] = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row), lineterminator="\n")
+            writer.writeheader()
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def create_parser() -> ArgumentParser:
+    parser: ArgumentParser = ArgumentParser(
+        prog="python -m DB.PokedexQuery",
+        description="Stream Pokédex data without starting the GUI."
+    )
+    parser.add_argument("--database", help="path to a PokedexDB.sqlite3 file")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    forms: ArgumentParser = commands.add_parser("forms", help="every form with its types, stats and abilities")
+    forms.add_argument("--game", help="limit to a game, e.g. 'Red/Blue/Yellow'")
+    forms.add_argument("--dex", help="limit to a dex, e.g. 'Kanto Pokedex'")
+    forms.add_argument("ids", nargs="*", help="national dex IDs to include, or - to read them from stdin")
+
+    entries: ArgumentParser = commands.add_parser("entries", help="every game/dex that includes each Pokémon")
+    entries.add_argument("ids", nargs="*", help="national dex IDs to include, or - to read them from stdin")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser: ArgumentParser = create_parser()
+    args: Namespace = parser.parse_args(argv)
+    game: Optional[str] = getattr(args, "game", None)
+    dex: Optional[str] = getattr(args, "dex", None)
+    try:
+        national_dex_ids: Optional[list] = list(read_ids(args.ids, sys.stdin)) if args.ids else None
+    except ValueError as error:
+        parser.error(str(error))
+
+    db: PokedexDB = PokedexDB(args.database)
+    try:
+        db.open()
+    except sqlite3.Error as error:
+        parser.error(f"cannot open the database: {error}")
+
+    with db:
+        unknown: Optional[str] = find_unknown(db, game, dex, national_dex_ids)
+        if unknown:
+            parser.error(unknown)
+
+        if args.command == "forms":
+            rows: Iterator[dict] = db.iter_forms(game, dex, national_dex_ids)
+        else:
+            rows: Iterator[dict] = db.iter_dex_entries(national_dex_ids)
+
+        lines: Iterator[str] = to_csv_lines(rows) if args.format == "csv" else to_json_lines(rows)
+        try:
+            sys.stdout.writelines(lines)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader (such as head) stopped early. Point stdout at devnull, so the flush on exit cannot fail too.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# Query plan regression check for every query PokedexDB ships.
+#
+# Runs each read method against a database, captures the statements it executes and fails if
+# EXPLAIN QUERY PLAN shows a full table (or full index) scan where an indexed lookup is expected.
+#
+# Usage (from the repository root):
+#   python -m DB.QueryPlanCheck [--database path/to/PokedexDB.sqlite3]
+
+# Python Libraries
+import sys
+from argparse import ArgumentParser, Namespace
+from typing import Callable, Iterator, Optional
+
+# Local Libraries
+from DB.DexSnapshot import DexSnapshot
+from DB.PokedexDB import PokedexDB
+
+
+# Return (name, call, full scan allowed) for every shipped read query, with arguments sampled from db.
+# Methods that read whole tables by design (listing games and every Pokémon, the one-off max stat aggregate and
+# type set masks, and full exports) are allowed to scan. The cached ones come first, while their caches are still cold.
+def get_checks(db: PokedexDB, sample_db: PokedexDB) -> list:
+    game: str = sample_db.get_games()[0]
+    dex: str = sample_db.get_dexes(game)[0]
+    snapshot: DexSnapshot = sample_db.load_dex(game, dex)
+    national_dex_id: int = snapshot.pokemon[0][0]
+    pokemon_id: int = snapshot.get_forms(national_dex_id)[0][0]
+    type_set_id, stat_set_id, ability_set_id, game_id = snapshot.get_header(pokemon_id)
+    type_id: int = snapshot.get_type_ids(type_set_id)[0]
+    return [
+        ("get_max_stats", lambda: db.get_max_stats(game_id), True),
+        ("get_type_set_masks", lambda: db.get_type_set_masks(), True),
+        ("get_games", lambda: db.get_games(), True),
+        ("get_all_pokemon", lambda: db.get_all_pokemon(), True),
+        ("get_dexes", lambda: db.get_dexes(game), False),
+        ("load_dex", lambda: db.load_dex(game, dex), False),
+        ("get_pokedex_headers", lambda: db.get_pokedex_headers(game, dex), False),
+        ("get_pokemon", lambda: db.get_pokemon(game, dex), False),
+        ("get_forms", lambda: db.get_forms(game, dex, national_dex_id), False),
+        ("get_type_icons", lambda: db.get_type_icons(type_set_id), False),
+        ("get_type_icon", lambda: db.get_type_icon(type_id), False),
+        ("get_stats", lambda: db.get_stats(stat_set_id), False),
+        ("get_stat_columns", lambda: db.get_stat_columns(game, dex), False),
+        ("get_generation", lambda: db.get_generation(game), False),
+        ("get_abilities", lambda: db.get_abilities(ability_set_id), False),
+        ("get_portrait_icon", lambda: db.get_portrait_icon(pokemon_id, False), False),
+        ("search", lambda: db.search(snapshot.pokemon[0][2]), False),
+        ("iter_forms", lambda: db.iter_forms(game, dex, [national_dex_id]), False),
+        ("iter_forms (export)", lambda: db.iter_forms(), True),
+        ("iter_dex_entries", lambda: db.iter_dex_entries([national_dex_id]), False),
+        ("get_species_history", lambda: db.get_species_history(national_dex_id), False),
+    ]
+
+
+# Returns True if a plan detail line reads a whole table or index. Full-text lookups and the
+# temporary ID table of a batch query (aliased "ids") are expected to be read in full.
+def is_full_scan(detail: str) -> bool:
+    return detail.startswith("SCAN ") and "VIRTUAL TABLE" not in detail and not detail.startswith("SCAN ids")
+
+
+# Run call and return (statement, plan details) for each query it executed.
+# Streaming results are explained while still open, so their temporary tables exist.
+def capture_plans(db: PokedexDB, call: Callable) -> list:
+    statements: list = []
+    db.ensure_search_index()
+    db.set_trace_callback(statements.append)
+    try:
+        result = call()
+        stream: Optional[Iterator] = result if isinstance(result, Iterator) else None
+        if stream is not None:
+            next(stream, None)
+    finally:
+        db.set_trace_callback(None)
+
+    plans: list = []
+    try:
+        for statement in statements:
+            # FTS5 reads its own shadow tables (PokemonSearch_*), which are not ours to index.
+            if statement.lstrip().lower().startswith(("select", "with")) and "PokemonSearch_" not in statement:
+                plans.append((statement, db.explain_query_plan(statement)))
+    finally:
+        if stream is not None:
+            stream.close()
+    return plans
+
+
+# Check every shipped query, returning a list of (name, statement, detail) for each unexpected scan.
+def check_query_plans(database: Optional[str] = None, verbose: bool = False) -> list:
+    failures: list = []
+    with PokedexDB(database) as db, PokedexDB(database) as sample_db:
+        for name, call, scan_allowed in get_checks(db, sample_db):
+            for statement, details in capture_plans(db, call):
+                if verbose:
+                    print(f"{name}:")
+                    for detail in details:
+                        print(f"    {detail}")
+                for detail in details:
+                    if is_full_scan(detail) and not scan_allowed:
+                        failures.append((name, statement, detail))
+    return failures
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser: ArgumentParser = ArgumentParser(
+        prog="python -m DB.QueryPlanCheck",
+        description="Fail if a shipped query falls back to a full table scan."
+    )
+    parser.add_argument("--database", help="path to a PokedexDB.sqlite3 file")
+    parser.add_argument("--verbose", action="store_true", help="print every query plan")
+    args: Namespace = parser.parse_args(argv)
+
+    failures: list = check_query_plans(args.database, args.verbose)
+    for name, statement, detail in failures:
+        print(f"FAIL {name}: {detail}\n{statement.strip()}\n", file=sys.stderr)
+    print(f"{len(failures)} unexpected full scan(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Memory-mapped sprite pack: every icon image in one file, read as zero-copy memoryview slices.
+#
+# Layout: MAGIC, a HEADER holding the database's icon version the pack was built from, the image data back to back,
+# then the index (one INDEX_ENTRY per portrait or type icon), then a FOOTER holding the entry count and the index
+# offset. Entries of identical images share one slice.
+
+# Python Libraries
+import mmap
+import sqlite3
+import struct
+from os import replace
+from os.path import exists
+from typing import Optional
+
+# Global Declarations
+MAGIC: bytes = b"PYPKSPR2"
+HEADER: struct.Struct = struct.Struct("<Q")  # icon version (IconVersion.Version)
+INDEX_ENTRY: struct.Struct = struct.Struct("<BIQI")  # kind, ID, offset, length
+FOOTER: struct.Struct = struct.Struct("<IQ")  # entry count, index offset
+PORTRAIT_NORMAL: int = 0  # Entry kinds
+PORTRAIT_SHINY: int = 1
+TYPE_ICON: int = 2
+
+
+# Return the icon version of the database behind conn. Triggers bump it on every write to Image
+# or to the icon columns of Pokemon and Type (see migration 3).
+def get_icon_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("select Version from IconVersion").fetchone()[0]
+
+
+# Return the icon version stamped in the pack at path, or None if it is missing or not a sprite pack.
+def read_version(path: str) -> Optional[int]:
+    if not exists(path):
+        return None
+    with open(path, "rb") as pack_file:
+        header: bytes = pack_file.read(len(MAGIC) + HEADER.size)
+    if len(header) < len(MAGIC) + HEADER.size or header[:len(MAGIC)] != MAGIC:
+        return None
+    return HEADER.unpack_from(header, len(MAGIC))[0]
+
+
+# Returns True if the pack at path is missing or was built from a different icon version than version.
+def is_stale(path: str, version: int) -> bool:
+    return read_version(path) != version
+
+
+# Write every icon referenced by the Pokemon and Type tables of conn to a sprite pack at path, stamped with
+# the icon version. The version is read first, so a write committed meanwhile leaves the pack stale, not wrong.
+# The pack is written to a temporary file first, so readers never see a partial pack.
+def build_sprite_pack(conn: sqlite3.Connection, path: str) -> None:
+    version: int = get_icon_version(conn)
+    entries: list = conn.execute("""
+        select 0, PokemonID, IconNormalImageID from Pokemon where IconNormalImageID is not null
+        union all
+        select 1, PokemonID, IconShinyImageID from Pokemon where IconShinyImageID is not null
+        union all
+        select 2, TypeID, TypeIconImageID from Type where TypeIconImageID is not null
+        """).fetchall()
+
+    temp_path: str = f"{path}.tmp"
+    slices: dict = {}  # ImageID -> (offset, length)
+    with open(temp_path, "wb") as pack_file:
+        pack_file.write(MAGIC)
+        pack_file.write(HEADER.pack(version))
+        offset: int = len(MAGIC) + HEADER.size
+        for image_id, data in conn.execute("select ImageID, Data from Image order by ImageID"):
+            pack_file.write(data)
+            slices[image_id] = (offset, len(data))
+            offset += len(data)
+
+        index: list = [(kind, key, *slices[image_id]) for kind, key, image_id in entries if image_id in slices]
+        for entry in index:
+            pack_file.write(INDEX_ENTRY.pack(*entry))
+        pack_file.write(FOOTER.pack(len(index), offset))
+    replace(temp_path, path)
+
+
+class SpritePack:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._mmap: Optional[mmap.mmap] = None
+        self.version: Optional[int] = None
+
+        # (kind, ID) -> (offset, length)
+        self._index: dict = {}
+
+    # Map the pack file and read its index. Raises ValueError if the file is not a sprite pack.
+    # The mapping keeps its own handle, so the file is closed at once; the mapping is released by close(),
+    # or when the pack is garbage collected.
+    def open(self) -> None:
+        with open(self.path, "rb") as pack_file:
+            self._mmap = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path} is not a sprite pack")
+            self.version = HEADER.unpack_from(self._mmap, len(MAGIC))[0]
+            count, index_offset = FOOTER.unpack_from(self._mmap, len(self._mmap) - FOOTER.size)
+            for kind, key, offset, length in INDEX_ENTRY.iter_unpack(
+                    self._mmap[index_offset:index_offset + count * INDEX_ENTRY.size]):
+                self._index[(kind, key)] = (offset, length)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    # Unmap the pack. Slices still held elsewhere keep the mapping alive until they are released.
+    def close(self) -> None:
+        self._index = {}
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Return a slice of the pack for passed entry kind and ID, or None if it has no image (or the pack is closed).
+    def get(self, kind: int, key: int) -> Optional[memoryview]:
+        mapping: Optional[mmap.mmap] = self._mmap
+        entry: Optional[tuple] = self._index.get((kind, key))
+        if entry is None or mapping is None:
+            return None
+        offset, length = entry
+        return memoryview(mapping)[offset:offset + length]
+
+    def get_portrait_icon(self, pokemon_id: int, shiny: bool) -> Optional[memoryview]:
+        return self.get(PORTRAIT_SHINY if shiny else PORTRAIT_NORMAL, pokemon_id)
+
+    def get_type_icon(self, type_id: int) -> Optional[memoryview]:
+        return self.get(TYPE_ICON, type_id)
@@ -0,0 +1,111 @@
+# Final stat calculator: turns a StatColumns block of base stats into actual stats at a level, for every form at once.
+# Generations 1-2 use DVs and stat experience; generation 3 onwards uses IVs, EVs and natures.
+
+# Python Libraries
+from array import array
+from math import isqrt
+from typing import Callable, Optional, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Local Libraries
+from DB.StatColumns import STAT_NAMES, StatColumns
+
+# Global Declarations
+MAX_DV: int = 15  # Gen 1-2 determinant values
+MAX_STAT_EXP: int = 65535  # Gen 1-2 stat experience
+MAX_IV: int = 31  # Gen 3+ individual values
+
+# Nature name -> (raised stat, lowered stat). Neutral natures raise and lower nothing.
+NATURES: dict = {
+    "Hardy": None, "Docile": None, "Serious": None, "Bashful": None, "Quirky": None,
+    "Lonely": ("ATK", "DEF"), "Brave": ("ATK", "SPE"), "Adamant": ("ATK", "SPA"), "Naughty": ("ATK", "SPD"),
+    "Bold": ("DEF", "ATK"), "Relaxed": ("DEF", "SPE"), "Impish": ("DEF", "SPA"), "Lax": ("DEF", "SPD"),
+    "Timid": ("SPE", "ATK"), "Hasty": ("SPE", "DEF"), "Jolly": ("SPE", "SPA"), "Naive": ("SPE", "SPD"),
+    "Modest": ("SPA", "ATK"), "Mild": ("SPA", "DEF"), "Quiet": ("SPA", "SPE"), "Rash": ("SPA", "SPD"),
+    "Calm": ("SPD", "ATK"), "Gentle": ("SPD", "DEF"), "Sassy": ("SPD", "SPE"), "Careful": ("SPD", "SPA"),
+}
+
+
+# Return the value of passed stat from either a single value for every stat, or a dict keyed by stat name.
+def get_stat_value(values: Union[int, dict], name: str, default: int) -> int:
+    if isinstance(values, dict):
+        return values.get(name, default)
+    return values
+
+
+# Apply passed formula to every value of a column, as one array operation when NumPy is available.
+def map_column(column, formula: Callable):
+    if numpy is not None:
+        return formula(column)
+    return array("q", map(formula, column))
+
+
+# Return actual stats of every row in base_stats at passed level, as a block aligned with base_stats.
+# ivs and evs are a value for every stat or a dict keyed by stat name. For generations 1-2 they are DVs
+# (0-15, HP derived from the others as in game) and stat experience (0-65535), and nature is ignored.
+def calculate_stats(base_stats: StatColumns, generation: int, level: int = 50,
+                    ivs: Optional[Union[int, dict]] = None, evs: Union[int, dict] = 0,
+                    nature: Optional[str] = None) -> StatColumns:
+    if not 1 <= level <= 100:
+        raise ValueError(f"Level must be between 1 and 100, not {level}")
+    if nature is not None and nature not in NATURES:
+        raise ValueError(f"Unknown nature {nature}")
+
+    if generation <= 2:
+        columns: dict = calculate_gen_1_2_stats(base_stats, level, MAX_DV if ivs is None else ivs, evs)
+    else:
+        columns: dict = calculate_stats_from_gen_3(base_stats, level, MAX_IV if ivs is None else ivs, evs, nature)
+    return StatColumns.from_columns(base_stats.pokemon_ids, columns)
+
+
+def calculate_gen_1_2_stats(base_stats: StatColumns, level: int, dvs: Union[int, dict],
+                            stat_exp: Union[int, dict]) -> dict:
+    # The HP DV is made of the lowest bit of the other DVs (SPA and SPD share the Special DV).
+    dv: dict = {name: get_stat_value(dvs, name, MAX_DV) for name in STAT_NAMES[1:]}
+    dv["HP"] = (dv["ATK"] & 1) << 3 | (dv["DEF"] & 1) << 2 | (dv["SPE"] & 1) << 1 | (dv["SPA"] & 1)
+
+    columns: dict = {}
+    for name in STAT_NAMES:
+        exp: int = min(max(get_stat_value(stat_exp, name, 0), 0), MAX_STAT_EXP)
+        exp_bonus: int = (isqrt(exp - 1) + 1 if exp else 0) // 4
+        bonus: int = level + 10 if name == "HP" else 5
+        columns[name] = map_column(
+            base_stats.columns[name],
+            lambda base, dv=dv[name], exp_bonus=exp_bonus, bonus=bonus:
+                ((base + dv) * 2 + exp_bonus) * level // 100 + bonus
+        )
+    return columns
+
+
+def calculate_stats_from_gen_3(base_stats: StatColumns, level: int, ivs: Union[int, dict], evs: Union[int, dict],
+                               nature: Optional[str]) -> dict:
+    raised, lowered = NATURES.get(nature) or (None, None)
+
+    columns: dict = {}
+    for name in STAT_NAMES:
+        iv: int = get_stat_value(ivs, name, MAX_IV)
+        ev_bonus: int = get_stat_value(evs, name, 0) // 4
+        if name == "HP":
+            columns[name] = map_column(
+                base_stats.columns[name],
+                lambda base, iv=iv, ev_bonus=ev_bonus: (2 * base + iv + ev_bonus) * level // 100 + level + 10
+            )
+            # Shedinja (the only base HP of 1) always has 1 HP.
+            if numpy is not None:
+                columns[name] = numpy.where(base_stats.columns[name] == 1, 1, columns[name])
+            else:
+                columns[name] = array("q", (
+                    1 if base == 1 else hp for base, hp in zip(base_stats.columns[name], columns[name])
+                ))
+        else:
+            multiplier: int = 110 if name == raised else 90 if name == lowered else 100
+            columns[name] = map_column(
+                base_stats.columns[name],
+                lambda base, iv=iv, ev_bonus=ev_bonus, multiplier=multiplier:
+                    ((2 * base + iv + ev_bonus) * level // 100 + 5) * multiplier // 100
+            )
+    return columns
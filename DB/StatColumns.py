@@ -0,0 +1,120 @@
+# Columnar stat block of a game/dex: one contiguous array per stat, aligned with an array of PokemonIDs.
+# Uses NumPy when it is installed, otherwise the standard library array module.
+
+# Python Libraries
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Global Declarations
+STAT_NAMES: tuple = ("HP", "ATK", "DEF", "SPA", "SPD", "SPE")
+TOTAL: str = "BST"  # Column of base stat totals
+
+
+class StatColumns:
+    def __init__(self, pokemon_ids, columns: dict) -> None:
+        self.pokemon_ids = pokemon_ids
+
+        # Stat name (and TOTAL) -> values, in the same order as pokemon_ids.
+        self.columns: dict = columns
+
+        # PokemonID -> row position, and stat name -> ascending values (built on first use).
+        self._positions: dict = {int(pokemon_id): position for position, pokemon_id in enumerate(pokemon_ids)}
+        self._sorted: dict = {}
+
+    # Build a block from (PokemonID, HP, ATK, DEF, SPA, SPD, SPE) rows. Missing stats count as 0.
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "StatColumns":
+        rows = [[value or 0 for value in row] for row in rows]
+        if numpy is not None:
+            block = numpy.array(rows, dtype=numpy.int64).reshape(-1, len(STAT_NAMES) + 1)
+            columns: dict = {
+                name: numpy.ascontiguousarray(block[:, column + 1]) for column, name in enumerate(STAT_NAMES)
+            }
+            columns[TOTAL] = block[:, 1:].sum(axis=1)
+            return cls(numpy.ascontiguousarray(block[:, 0]), columns)
+
+        columns: dict = {name: array("q", (row[column + 1] for row in rows)) for column, name in enumerate(STAT_NAMES)}
+        columns[TOTAL] = array("q", (sum(row[1:]) for row in rows))
+        return cls(array("q", (row[0] for row in rows)), columns)
+
+    # Build a block from a PokemonID column and a dict of stat columns aligned with it, adding the totals.
+    @classmethod
+    def from_columns(cls, pokemon_ids, columns: dict) -> "StatColumns":
+        columns = {name: columns[name] for name in STAT_NAMES}
+        if numpy is not None:
+            columns[TOTAL] = sum(columns[name] for name in STAT_NAMES)
+        else:
+            columns[TOTAL] = array("q", map(sum, zip(*(columns[name] for name in STAT_NAMES))))
+        return cls(pokemon_ids, columns)
+
+    def __len__(self) -> int:
+        return len(self.pokemon_ids)
+
+    # Return the row position of passed Pokémon ID, or None if it is not in the block.
+    def get_position(self, pokemon_id: int) -> Optional[int]:
+        return self._positions.get(pokemon_id)
+
+    # Return [HP, ATK, DEF, SPA, SPD, SPE] of passed Pokémon ID, or None if it is not in the block.
+    def get_stats(self, pokemon_id: int) -> Optional[list]:
+        position: Optional[int] = self._positions.get(pokemon_id)
+        if position is None:
+            return None
+        return [int(self.columns[name][position]) for name in STAT_NAMES]
+
+    def get_totals(self):
+        return self.columns[TOTAL]
+
+    def get_minimum(self, name: str) -> int:
+        if not len(self):
+            return 0
+        return int(self.columns[name].min()) if numpy is not None else min(self.columns[name])
+
+    def get_maximum(self, name: str) -> int:
+        if not len(self):
+            return 0
+        return int(self.columns[name].max()) if numpy is not None else max(self.columns[name])
+
+    # Return the rank of every row in passed column, 1 being the highest value. Ties share the best rank.
+    def get_ranks(self, name: str):
+        values = self.columns[name]
+        ordered = self._get_sorted(name)
+        if numpy is not None:
+            return len(self) - numpy.searchsorted(ordered, values, side="right") + 1
+        return array("q", (len(self) - bisect_right(ordered, value) + 1 for value in values))
+
+    # Return the percentile of every row in passed column: the percentage of rows with a lower value.
+    def get_percentiles(self, name: str):
+        values = self.columns[name]
+        ordered = self._get_sorted(name)
+        if not len(self):
+            return values
+        if numpy is not None:
+            return numpy.searchsorted(ordered, values, side="left") * 100.0 / len(self)
+        return array("d", (bisect_left(ordered, value) * 100.0 / len(self) for value in values))
+
+    # Return (rank, row count) of passed Pokémon ID in passed column, or None if it is not in the block.
+    def get_rank(self, pokemon_id: int, name: str) -> Optional[tuple]:
+        position: Optional[int] = self._positions.get(pokemon_id)
+        if position is None:
+            return None
+        ordered = self._get_sorted(name)
+        value: int = int(self.columns[name][position])
+        if numpy is not None:
+            above: int = len(self) - int(numpy.searchsorted(ordered, value, side="right"))
+        else:
+            above: int = len(self) - bisect_right(ordered, value)
+        return above + 1, len(self)
+
+    # Return ascending values of passed column, sorting it on first use.
+    def _get_sorted(self, name: str):
+        ordered = self._sorted.get(name)
+        if ordered is None:
+            ordered = numpy.sort(self.columns[name]) if numpy is not None else sorted(self.columns[name])
+            self._sorted[name] = ordered
+        return ordered
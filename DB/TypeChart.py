@@ -0,0 +1,129 @@
+# Type matchup engine: a per-generation effectiveness matrix, with each type combination encoded as a bitmask
+# (one bit per type in TYPE_NAMES), so matchups of a whole dex are answered with set lookups instead of SQL.
+
+# Python Libraries
+from itertools import combinations
+from math import prod
+from typing import Iterable, Optional
+
+# Global Declarations
+TYPE_NAMES: tuple = (
+    "Normal", "Fire", "Water", "Grass", "Electric", "Ice", "Fighting", "Poison", "Ground",
+    "Flying", "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy"
+)
+TYPE_BITS: dict = {name: 1 << bit for bit, name in enumerate(TYPE_NAMES)}
+INTRODUCED: dict = {"Dark": 2, "Steel": 2, "Fairy": 6}  # Generation of types added after generation 1
+
+# Attacking type -> {defending type: multiplier} from generation 6 on. Unlisted matchups are neutral.
+CHART: dict = {
+    "Normal": {"Rock": 0.5, "Ghost": 0.0, "Steel": 0.5},
+    "Fire": {"Fire": 0.5, "Water": 0.5, "Grass": 2.0, "Ice": 2.0, "Bug": 2.0, "Rock": 0.5, "Dragon": 0.5,
+             "Steel": 2.0},
+    "Water": {"Fire": 2.0, "Water": 0.5, "Grass": 0.5, "Ground": 2.0, "Rock": 2.0, "Dragon": 0.5},
+    "Grass": {"Fire": 0.5, "Water": 2.0, "Grass": 0.5, "Poison": 0.5, "Ground": 2.0, "Flying": 0.5, "Bug": 0.5,
+              "Rock": 2.0, "Dragon": 0.5, "Steel": 0.5},
+    "Electric": {"Water": 2.0, "Grass": 0.5, "Electric": 0.5, "Ground": 0.0, "Flying": 2.0, "Dragon": 0.5},
+    "Ice": {"Fire": 0.5, "Water": 0.5, "Grass": 2.0, "Ice": 0.5, "Ground": 2.0, "Flying": 2.0, "Dragon": 2.0,
+            "Steel": 0.5},
+    "Fighting": {"Normal": 2.0, "Ice": 2.0, "Poison": 0.5, "Flying": 0.5, "Psychic": 0.5, "Bug": 0.5, "Rock": 2.0,
+                 "Ghost": 0.0, "Dark": 2.0, "Steel": 2.0, "Fairy": 0.5},
+    "Poison": {"Grass": 2.0, "Poison": 0.5, "Ground": 0.5, "Rock": 0.5, "Ghost": 0.5, "Steel": 0.0, "Fairy": 2.0},
+    "Ground": {"Fire": 2.0, "Grass": 0.5, "Electric": 2.0, "Poison": 2.0, "Flying": 0.0, "Bug": 0.5, "Rock": 2.0,
+               "Steel": 2.0},
+    "Flying": {"Grass": 2.0, "Electric": 0.5, "Fighting": 2.0, "Bug": 2.0, "Rock": 0.5, "Steel": 0.5},
+    "Psychic": {"Fighting": 2.0, "Poison": 2.0, "Psychic": 0.5, "Dark": 0.0, "Steel": 0.5},
+    "Bug": {"Fire": 0.5, "Grass": 2.0, "Fighting": 0.5, "Poison": 0.5, "Flying": 0.5, "Psychic": 2.0, "Ghost": 0.5,
+            "Dark": 2.0, "Steel": 0.5, "Fairy": 0.5},
+    "Rock": {"Fire": 2.0, "Ice": 2.0, "Fighting": 0.5, "Ground": 0.5, "Flying": 2.0, "Bug": 2.0, "Steel": 0.5},
+    "Ghost": {"Normal": 0.0, "Psychic": 2.0, "Ghost": 2.0, "Dark": 0.5},
+    "Dragon": {"Dragon": 2.0, "Steel": 0.5, "Fairy": 0.0},
+    "Dark": {"Fighting": 0.5, "Psychic": 2.0, "Ghost": 2.0, "Dark": 0.5, "Fairy": 0.5},
+    "Steel": {"Fire": 0.5, "Water": 0.5, "Electric": 0.5, "Ice": 2.0, "Rock": 2.0, "Steel": 0.5, "Fairy": 2.0},
+    "Fairy": {"Fire": 0.5, "Fighting": 2.0, "Poison": 0.5, "Dragon": 2.0, "Dark": 2.0, "Steel": 0.5},
+}
+
+# Matchups that differed in earlier generations: (last generation, attacking type, defending type, multiplier).
+CHART_CHANGES: tuple = (
+    (5, "Ghost", "Steel", 0.5),
+    (5, "Dark", "Steel", 0.5),
+    (1, "Bug", "Poison", 2.0),
+    (1, "Poison", "Bug", 2.0),
+    (1, "Ghost", "Psychic", 0.0),
+    (1, "Ice", "Fire", 1.0),
+)
+
+
+# Return the bitmask of passed type names. Names that are not types (such as "None") add no bit.
+def get_type_mask(*type_names: Optional[str]) -> int:
+    mask: int = 0
+    for type_name in type_names:
+        mask |= TYPE_BITS.get(type_name, 0)
+    return mask
+
+
+# Return type names of passed bitmask, in TYPE_NAMES order.
+def get_type_names(mask: int) -> list:
+    return [type_name for type_name in TYPE_NAMES if mask & TYPE_BITS[type_name]]
+
+
+# Return the effectiveness matrix of passed generation: matrix[attacking][defending], indexed by TYPE_NAMES position.
+# Types that did not exist yet are neutral both ways.
+def build_matrix(generation: int) -> list:
+    chart: dict = {attacking: dict(defending) for attacking, defending in CHART.items()}
+    for last_generation, attacking, defending, multiplier in CHART_CHANGES:
+        if generation <= last_generation:
+            chart[attacking][defending] = multiplier
+    present: set = {type_name for type_name in TYPE_NAMES if INTRODUCED.get(type_name, 1) <= generation}
+    return [
+        [
+            chart[attacking].get(defending, 1.0) if attacking in present and defending in present else 1.0
+            for defending in TYPE_NAMES
+        ]
+        for attacking in TYPE_NAMES
+    ]
+
+
+class TypeChart:
+    def __init__(self, generation: int) -> None:
+        self.generation: int = generation
+
+        # Types that exist in the generation, in TYPE_NAMES order.
+        self.types: list = [type_name for type_name in TYPE_NAMES if INTRODUCED.get(type_name, 1) <= generation]
+
+        # Bitmask of every single and dual type -> multipliers of each attacking type, in TYPE_NAMES order.
+        matrix: list = build_matrix(generation)
+        self.multipliers: dict = {0: (1.0,) * len(TYPE_NAMES)}
+        for defending in (*combinations(range(len(TYPE_NAMES)), 1), *combinations(range(len(TYPE_NAMES)), 2)):
+            mask: int = sum(1 << bit for bit in defending)
+            self.multipliers[mask] = tuple(
+                prod(matrix[attacking][bit] for bit in defending) for attacking in range(len(TYPE_NAMES))
+            )
+
+        # Attacking type -> bitmasks that resist it (including immunities), and bitmasks weak to it.
+        self.resisting: dict = {}
+        self.weak: dict = {}
+        for attacking, type_name in enumerate(TYPE_NAMES):
+            self.resisting[type_name] = frozenset(
+                mask for mask, multipliers in self.multipliers.items() if multipliers[attacking] < 1.0
+            )
+            self.weak[type_name] = frozenset(
+                mask for mask, multipliers in self.multipliers.items() if multipliers[attacking] > 1.0
+            )
+
+    # Return the multiplier of passed attacking type against passed bitmask.
+    def get_multiplier(self, attacking: str, mask: int) -> float:
+        return self.multipliers[mask][TYPE_NAMES.index(attacking)]
+
+    # Return {attacking type: multiplier} for passed bitmask, for every type of the generation.
+    def get_matchups(self, mask: int) -> dict:
+        multipliers: tuple = self.multipliers[mask]
+        return {type_name: multipliers[TYPE_NAMES.index(type_name)] for type_name in self.types}
+
+    # Return the keys of masks (key -> bitmask) that resist every type in resists and are weak to every type in weak_to.
+    def find(self, masks: dict, resists: Iterable[str] = (), weak_to: Iterable[str] = ()) -> list:
+        allowed: Optional[frozenset] = None
+        for mask_set in (*(self.resisting[name] for name in resists), *(self.weak[name] for name in weak_to)):
+            allowed = mask_set if allowed is None else allowed & mask_set
+        if allowed is None:
+            return list(masks)
+        return [key for key, mask in masks.items() if mask in allowed]
@@ -1,35 +1,64 @@
 # Python Libraries
-from tkinter import TclError, Tk
+from os.path import dirname
+from time import perf_counter
+from tkinter import Event, PhotoImage, TclError, Tk
 from tkinter.ttk import Frame, Notebook
-from typing import Optional
+from typing import Callable, Optional
 
 # Local Libraries
-from DB.PokedexDB import PokedexDB
+from DB.DexSnapshot import DexSnapshot
+from DB.Instrumentation import dump, is_enabled, record, timed
+from DB.PokedexDB import REPLICA_CHECK_INTERVAL, PokedexDB, split_search_words
+from DB.StatColumns import STAT_NAMES, TOTAL, StatColumns
+from UI.DBWorker import DBWorker
+from UI.HistoryWindow import HistoryWindow
+from UI.ImageCache import ImageCache, portrait_key, type_icon_key
+from UI.Prefetcher import Prefetcher
+from UI.StartupCache import load_startup_cache, save_startup_cache
 from UI.ViewerTab import ViewerTab
 
 # Global Declarations
 TITLE: str = "PyPokédex"
 VERSION: str = "1.0.0"  # TODO move to attributes file of some kind
+PREFETCH_WINDOW: int = 5  # Neighbouring Pokémon warmed on each side of the selection
+FULL_TEXT_LIMIT: int = 500  # Full-text matches considered when filtering the Pokémon list
+STARTUP_CACHE: str = f"{dirname(__file__)}/StartupCache.json"  # Last selection, shown while the database loads
+START_TIME: float = perf_counter()  # Startup timings are measured from when this module is imported
 
 
 class PokedexApp:
-    def __init__(self):
+    def __init__(self, db: Optional[PokedexDB] = None, start: bool = True,
+                 startup_hook: Optional[Callable[[dict], None]] = None):
         # Database
-        self.db: PokedexDB = PokedexDB()
+        self.db: PokedexDB = db or PokedexDB(sprite_pack=True, in_memory=True)
 
+        self.root: Optional[Tk] = None
         self.tab_menu: Optional[Notebook] = None
         self.tab1: Optional[Frame] = None
         self.tab2: Optional[Frame] = None
         self.viewer_tab: Optional[ViewerTab] = None
+        self.image_cache: Optional[ImageCache] = None
+        self.worker: Optional[DBWorker] = None
+        self.prefetcher: Optional[Prefetcher] = None
+        self.history_window: Optional[HistoryWindow] = None
 
-        #
-        self.Pokedex_headers: dict = {}
+        # Snapshot of the selected game/dex, used to serve selections without SQL
+        self.snapshot: DexSnapshot = DexSnapshot("", "")
+        self.games: list = []
 
-        # Start application
-        self.create_main_window()
+        # Startup state: the dex to select once the startup game's dexes load, and milliseconds since
+        # START_TIME to first paint, cached content and interactive, passed to startup_hook once interactive.
+        self.preferred_dex: Optional[str] = None
+        self.startup_timings: dict = {}
+        self.startup_hook: Optional[Callable[[dict], None]] = startup_hook
+
+        # Start application (headless tools pass start=False and supply their own viewer)
+        if start:
+            self.create_main_window()
 
     def create_main_window(self) -> None:
         root = Tk()
+        self.root = root
         root.title(TITLE)
         root.geometry("565x585")
         root.resizable(False, False)
@@ -48,6 +77,10 @@ class PokedexApp:
         self.tab_menu.add(self.tab2, text="Pokédex Editor")
 
         self.viewer_tab = ViewerTab(self.tab1)
+        self.image_cache = ImageCache()
+        self.worker = DBWorker(root)
+        self.prefetcher = Prefetcher(self.worker, self.image_cache, self.fetch_icons, PREFETCH_WINDOW)
+        self.history_window = HistoryWindow(root)
         # self.editor_tab: Frame = Frame(self.tab_menu)
 
         self.viewer_tab.pokemon_tree.bind("<<TreeviewSelect>>", self.on_pokemon_changed)
@@ -55,8 +88,14 @@ class PokedexApp:
         self.viewer_tab.game_var.trace("w", self.on_game_changed)
         self.viewer_tab.dex_var.trace("w", self.on_dex_changed)
         self.viewer_tab.shiny.trace("w", self.on_shiny_changed)
-        games: list = self.db.get_games()
-        self.viewer_tab.refresh_games(games)
+        self.viewer_tab.stat_level_var.trace("w", self.on_stat_level_changed)
+        self.viewer_tab.full_text_search = self.search_national_dex_ids
+        self.viewer_tab.history_btn.configure(command=self.on_history_clicked)
+        if is_enabled():
+            root.bind("<F12>", lambda event: dump())
+
+        # Data is loaded once the window has been painted
+        root.bind("<Map>", self.on_window_mapped)
 
         # Frame placement
         self.tab_menu.grid(column=0, row=0)
@@ -64,55 +103,217 @@ class PokedexApp:
         # Start loop
         root.mainloop()
 
+        # Remember the selection for the next start, then stop the worker and release the database connection
+        if self.snapshot.pokemon:
+            save_startup_cache(STARTUP_CACHE, self.db.get_database_path(), self.snapshot.game, self.snapshot.dex,
+                               self.games, self.snapshot.pokemon)
+        self.worker.stop()
+        self.db.close()
+
+    # Record milliseconds since START_TIME as startup timing name (also reported to instrumentation).
+    def record_startup_time(self, name: str) -> None:
+        elapsed: float = perf_counter() - START_TIME
+        self.startup_timings[name] = elapsed * 1000
+        record(f"startup.{name}", elapsed)
+
+    # Look up national dex IDs whose names, forms or abilities match passed search term in the background,
+    # passing them to callback. Keystrokes are debounced, and a newer search supersedes an older one.
+    def search_national_dex_ids(self, term: str, callback: Callable[[list], None]) -> None:
+        self.worker.submit("search", self.find_national_dex_ids, term, self.snapshot, callback=callback, debounce=True)
+
+    # Return national dex IDs of forms in snapshot whose names, form names or abilities match passed search term
+    # (runs on the worker). The full-text index holds abilities from every game, so each match is checked again
+    # against the form's abilities in the snapshot's game.
+    def find_national_dex_ids(self, term: str, snapshot: DexSnapshot) -> list:
+        words: list = split_search_words(term)
+        national_dex_ids: list = []
+        for pokemon_id, national_dex_id, pokemon_name, form_name, _ in self.db.search(term, FULL_TEXT_LIMIT):
+            if pokemon_id not in snapshot.headers:
+                continue
+            abilities: tuple = snapshot.get_abilities(snapshot.get_header(pokemon_id)[2])
+            form_words: list = split_search_words(
+                " ".join((pokemon_name, form_name, *(ability for ability in abilities if ability != "N/A")))
+            )
+            if all(any(form_word.startswith(word) for form_word in form_words) for word in words):
+                national_dex_ids.append(national_dex_id)
+        return national_dex_ids
+
+    # Return (PokemonID, shiny, type IDs) for the current form selection.
+    def get_icon_selection(self) -> tuple:
+        pokemon_id: int = self.viewer_tab.get_pokemon_id()
+        shiny: bool = bool(self.viewer_tab.shiny.get())
+        type_ids: tuple = self.snapshot.get_type_ids(self.snapshot.get_header(pokemon_id)[0]) or ()
+        return pokemon_id, shiny, type_ids
+
+    # Show icons for the current selection, loading missing ones in the background.
+    @timed
+    def refresh_icons(self) -> None:
+        pokemon_id, shiny, type_ids = self.get_icon_selection()
+        if not pokemon_id:
+            self.worker.cancel("icons")
+            return
+
+        keys: list = [portrait_key(pokemon_id, shiny)] + [type_icon_key(type_id) for type_id in type_ids]
+        missing: list = [key for key in keys if key not in self.image_cache]
+        if missing:
+            self.worker.submit("icons", self.fetch_icons, missing, callback=self.show_icons, debounce=True)
+        else:
+            self.worker.cancel("icons")
+            self.show_icons({})
+
+    # Return a dict of icon bytes for passed cache keys (runs on the worker thread).
+    @timed
+    def fetch_icons(self, keys: list) -> dict:
+        icons: dict = {}
+        for key in keys:
+            if key[0] == "portrait":
+                icons[key] = self.db.get_portrait_icon(key[1], key[2])
+            else:
+                icons[key] = self.db.get_type_icon(key[1])
+        return icons
+
+    # Show icons for the current selection, decoding passed icon bytes into the cache first. Icons neither
+    # cached nor passed (the selection changed after they were requested) are fetched in the background,
+    # never on the main thread. An icon fetched as None (no image) counts as passed.
+    @timed
+    def show_icons(self, icons: dict) -> None:
+        for key, icon_data in icons.items():
+            if key not in self.image_cache:
+                self.image_cache.put(key, icon_data)
+
+        pokemon_id, shiny, type_ids = self.get_icon_selection()
+        if not pokemon_id:
+            return
+        keys: list = [portrait_key(pokemon_id, shiny)] + [type_icon_key(type_id) for type_id in type_ids]
+        missing: list = [key for key in keys if key not in self.image_cache]
+        if missing:
+            self.worker.submit("icons", self.fetch_icons, missing, callback=self.show_icons, debounce=True)
+            return
+
+        portrait_icon: PhotoImage = self.image_cache.get_portrait(
+            pokemon_id, shiny, lambda p, s: icons[portrait_key(p, s)]
+        )
+        type_icons: tuple = tuple(
+            self.image_cache.get_type_icon(type_id, lambda t: icons[type_icon_key(t)])
+            for type_id in type_ids
+        )
+        self.viewer_tab.refresh_portrait_icon(portrait_icon)
+        self.viewer_tab.refresh_type_icons(type_icons)
+
     # Event Handlers
+    # Paint the window, show the last session's selection from the startup cache, then load games in the background.
+    def on_window_mapped(self, event: Event) -> None:
+        if event.widget is not self.root or "first_paint" in self.startup_timings:
+            return
+        self.root.update_idletasks()
+        self.record_startup_time("first_paint")
+
+        cache: Optional[dict] = load_startup_cache(STARTUP_CACHE, self.db.get_database_path())
+        if cache:
+            self.games = cache["games"]
+            self.preferred_dex = cache["dex"]
+            self.viewer_tab.refresh_pokemon_tree(cache["pokemon"])
+            self.record_startup_time("cached_content")
+            self.viewer_tab.refresh_games(self.games, cache["game"])
+        self.worker.submit("games", self.db.get_games, callback=self.on_games_loaded)
+
+    @timed
+    def on_games_loaded(self, games: list) -> None:
+        if games != self.games:
+            self.games = games
+            self.viewer_tab.refresh_games(games, self.viewer_tab.get_game())
+
+    @timed
     def on_pokemon_changed(self, event) -> None:
-        game: str = self.viewer_tab.get_game()
-        dex: str = self.viewer_tab.get_dex()
         national_dex_id: int = self.viewer_tab.get_national_dex_id()
-        forms: list = self.db.get_forms(game, dex, national_dex_id)
+        forms: list = self.snapshot.get_forms(national_dex_id)
         self.viewer_tab.refresh_form_tree(forms)
 
+        # Warm the icons of the rows the user is likely to step to next
+        neighbors: list = self.viewer_tab.get_neighbor_national_dex_ids(self.prefetcher.window)
+        self.prefetcher.prefetch(self.snapshot, neighbors)
+
+    @timed
     def on_form_changed(self, event) -> None:
         pokemon_id: int = self.viewer_tab.get_pokemon_id()
-        shiny: bool = bool(self.viewer_tab.shiny.get())
-        type_set_id: int = self.Pokedex_headers[pokemon_id][0]
-        stat_set_id: int = self.Pokedex_headers[pokemon_id][1]
-        ability_set_id: int = self.Pokedex_headers[pokemon_id][2]
-        game_id: int = self.Pokedex_headers[pokemon_id][3]
+        type_set_id, stat_set_id, ability_set_id, game_id = self.snapshot.get_header(pokemon_id)
 
-        portrait_icon: bytes = self.db.get_portrait_icon(pokemon_id, shiny)
-        type_icons: tuple = self.db.get_type_icons(type_set_id)
-        stats: list = self.db.get_stats(stat_set_id)
-        max_stats: tuple = self.db.get_max_stats(game_id)
-        abilities: tuple = self.db.get_abilities(ability_set_id)
+        # Text data comes from the snapshot right away; icons follow once the selection settles.
+        stat_columns: StatColumns = self.snapshot.stat_columns
+        stats: list = self.snapshot.get_stats(stat_set_id)
+        max_stats: tuple = self.snapshot.max_stats
+        level: int = self.viewer_tab.get_stat_level()
+        if level:
+            # Actual stats are calculated for the whole dex at once, and bars scale to the dex's highest.
+            stat_columns = self.snapshot.get_level_stats(level)
+            stats = stat_columns.get_stats(pokemon_id) or [0, 0, 0, 0, 0, 0]
+            max_stats = (stat_columns.get_maximum("HP"), max(stat_columns.get_maximum(name) for name in STAT_NAMES[1:]))
+        abilities: tuple = self.snapshot.get_abilities(ability_set_id)
+        ranks: list = [stat_columns.get_rank(pokemon_id, name) for name in (*STAT_NAMES, TOTAL)]
 
-        self.viewer_tab.refresh_portrait_icon(portrait_icon)
-        self.viewer_tab.refresh_type_icons(type_icons)
         self.viewer_tab.refresh_max_stats(max_stats)
         self.viewer_tab.refresh_stats(stats)
+        self.viewer_tab.refresh_stat_ranks(ranks)
         self.viewer_tab.refresh_abilities(abilities)
+        self.viewer_tab.refresh_matchups(self.snapshot.get_matchups(pokemon_id))
+        self.refresh_icons()
 
+    @timed
     def on_game_changed(self, *args) -> None:
         game: str = self.viewer_tab.get_game()
 
         # Refresh dex data
-        dexes: list = self.db.get_dexes(game)
-        self.viewer_tab.refresh_dexes(dexes)
+        self.worker.submit("game", self.db.get_dexes, game, callback=self.on_dexes_loaded)
 
+    @timed
+    def on_dexes_loaded(self, dexes: list) -> None:
+        self.viewer_tab.refresh_dexes(dexes, self.preferred_dex)
+        self.preferred_dex = None
+
+    @timed
     def on_dex_changed(self, *args) -> None:
         game: str = self.viewer_tab.get_game()
         dex: str = self.viewer_tab.get_dex()
 
-        # Refresh Pokémon list
-        self.Pokedex_headers = self.db.get_pokedex_headers(game, dex)
-        pokemon: list = self.db.get_pokemon(game, dex)
-        self.viewer_tab.refresh_pokemon_tree(pokemon)
+        # Load the whole dex once in the background, then refresh the Pokémon list from memory
+        self.worker.submit("dex", self.db.load_dex, game, dex, callback=self.on_dex_loaded)
+
+    @timed
+    def on_dex_loaded(self, snapshot: DexSnapshot) -> None:
+        self.snapshot = snapshot
+        self.viewer_tab.refresh_pokemon_tree(self.snapshot.pokemon)
 
+        # The first real Pokémon list makes the window interactive; background work can start now.
+        if "first_paint" in self.startup_timings and "interactive" not in self.startup_timings:
+            self.record_startup_time("interactive")
+            self.worker.submit("search_index", self.db.ensure_search_index, callback=lambda available: None)
+            self.refresh_replica()
+            if self.startup_hook:
+                self.startup_hook(dict(self.startup_timings))
+
+    # Refresh the database's in-memory replica on the worker, then again every REPLICA_CHECK_INTERVAL.
+    def refresh_replica(self) -> None:
+        self.worker.submit("replica", self.db.refresh_replica, callback=lambda loaded: None)
+        self.root.after(int(REPLICA_CHECK_INTERVAL * 1000), self.refresh_replica)
+
+    @timed
     def on_shiny_changed(self, *args) -> None:
-        pokemon_id: int = self.viewer_tab.get_pokemon_id()
-        shiny: bool = bool(self.viewer_tab.shiny.get())
-        portrait_icon: bytes = self.db.get_portrait_icon(pokemon_id, shiny)
-        self.viewer_tab.refresh_portrait_icon(portrait_icon)
+        self.refresh_icons()
+
+    @timed
+    def on_stat_level_changed(self, *args) -> None:
+        self.on_form_changed(None)
+
+    # Load the selected species' history across games in the background, then show it in the history window.
+    def on_history_clicked(self) -> None:
+        national_dex_id: int = self.viewer_tab.get_national_dex_id()
+        if national_dex_id:
+            self.worker.submit("history", self.db.get_species_history, national_dex_id, callback=self.on_history_loaded)
+
+    @timed
+    def on_history_loaded(self, history: list) -> None:
+        if history:
+            self.history_window.show(f"{history[0]['PokemonName']} - History", history)
 
 
 def main() -> None:
@@ -0,0 +1,109 @@
+# Runs PokedexDB calls on a background thread and hands results back to the Tk main thread
+
+# Python Libraries
+import sys
+from queue import Empty, Queue
+from threading import Thread
+from tkinter import Misc
+from typing import Callable, Optional
+
+# Global Declarations
+POLL_MS: int = 10  # How often the main thread checks for finished requests
+DEBOUNCE_MS: int = 40  # Delay before a debounced request is started
+
+
+class DBWorker:
+    def __init__(self, root: Optional[Misc] = None, debounce_ms: int = DEBOUNCE_MS) -> None:
+        # Without a root window, requests run synchronously on the calling thread.
+        self.root: Optional[Misc] = root
+        self.debounce_ms: int = debounce_ms
+
+        # Latest generation token per channel; results of older generations are dropped.
+        self._generations: dict = {}
+        self._debounce_ids: dict = {}
+        self._pending: int = 0
+        self._polling: bool = False
+
+        self._requests: Queue = Queue()
+        self._results: Queue = Queue()
+        self._thread: Optional[Thread] = None
+        if self.root is not None:
+            self._thread = Thread(target=self._run, name="DBWorker", daemon=True)
+            self._thread.start()
+
+    # Run func(*args) in the background and pass its result to callback on the main thread.
+    # Submitting to a channel supersedes any earlier request on the same channel.
+    def submit(self, channel: str, func: Callable, *args, callback: Callable, debounce: bool = False) -> int:
+        generation: int = self.cancel(channel)
+        request: tuple = (channel, generation, func, args, callback)
+
+        if self.root is None:
+            callback(func(*args))
+        elif debounce:
+            self._debounce_ids[channel] = self.root.after(self.debounce_ms, lambda: self._enqueue(request))
+        else:
+            self._enqueue(request)
+        return generation
+
+    # Invalidate any outstanding request on channel, returning the next generation token.
+    def cancel(self, channel: str) -> int:
+        generation: int = self._generations.get(channel, 0) + 1
+        self._generations[channel] = generation
+        debounce_id: Optional[str] = self._debounce_ids.pop(channel, None)
+        if debounce_id is not None:
+            self.root.after_cancel(debounce_id)
+        return generation
+
+    # Returns True if generation is still the latest for channel.
+    def is_current(self, channel: str, generation: int) -> bool:
+        return self._generations.get(channel) == generation
+
+    # Stop the background thread once queued requests are drained.
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _enqueue(self, request: tuple) -> None:
+        self._debounce_ids.pop(request[0], None)
+        self._pending += 1
+        self._requests.put(request)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+
+    # Background thread loop, skipping requests that were superseded while queued.
+    def _run(self) -> None:
+        while True:
+            request: Optional[tuple] = self._requests.get()
+            if request is None:
+                break
+            channel, generation, func, args, callback = request
+            if not self.is_current(channel, generation):
+                self._results.put((channel, generation, callback, None, None))
+                continue
+            try:
+                self._results.put((channel, generation, callback, func(*args), None))
+            except Exception:
+                self._results.put((channel, generation, callback, None, sys.exc_info()))
+
+    # Main thread loop, delivering current results and rescheduling while requests are pending.
+    def _poll(self) -> None:
+        while True:
+            try:
+                channel, generation, callback, result, error = self._results.get_nowait()
+            except Empty:
+                break
+            self._pending -= 1
+            if not self.is_current(channel, generation):
+                continue
+            if error is not None:
+                self.root.report_callback_exception(*error)
+            else:
+                callback(result)
+
+        if self._pending:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
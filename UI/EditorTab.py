@@ -1,14 +1,17 @@
 # Python Libraries
 import tkinter as tk
 from tkinter import ttk
-from tkinter.filedialog import askopenfilename
+from tkinter.filedialog import askdirectory, askopenfilename
+from tkinter.messagebox import showinfo, showwarning
 
 # Local Libraries
-from DB.PokedexDB import PokeDexDB
+from DB.IconImport import import_icons, scan_directory
+from DB.PokedexDB import PokedexDB
 
 # Global Declarations
 TITLE: str = "RegionalDexBuilder"
 VERSION: str = "1.0.0"  # TODO move to attributes file of some kind
+MAX_LISTED_FAILURES: int = 10  # Failed files listed after a bulk icon import
 
 
 def image_to_blob(image_path: str) -> bytes:
@@ -21,12 +24,13 @@ def image_to_blob(image_path: str) -> bytes:
 class PokemonEditor:
     def __init__(self):
         # Database
-        self.db: PokeDexDB = PokeDexDB()
+        self.db: PokedexDB = PokedexDB()
 
         # Selection Variables
         self.cur_pokemon_id: int = 1
 
         # Control Variables
+        self.root = None
         self.pkmn_tree = None
         self.icon_normal_lbl = None
         self.icon_shiny_lbl = None
@@ -35,6 +39,7 @@ class PokemonEditor:
 
     def _create_main_window(self):
         root = tk.Tk()
+        self.root = root
         root.title(TITLE)
         root.geometry("800x600")
         root.resizable(False, False)
@@ -60,6 +65,11 @@ class PokemonEditor:
         self.icon_shiny_lbl = tk.Label(root, width=112, height=112)
         self.split_genders_btn = tk.Button(root, text="Split Gendered Forms", command=self._on_split_genders_clicked)
         self.add_gigantamax_btn = tk.Button(root, text="Add Gigantamax Form", command=self._on_gigantamax_clicked)
+        self.import_icons_btn = tk.Button(root, text="Import Icon Folder", command=self._on_import_icons_clicked)
+
+        # PokedexDB has no form splitting or Gigantamax support yet, so those buttons stay disabled.
+        self.split_genders_btn.config(state=tk.DISABLED)
+        self.add_gigantamax_btn.config(state=tk.DISABLED)
 
         # Bindings
         self.icon_normal_lbl.bind("<Button-1>", self._on_icon_normal_clicked)
@@ -71,6 +81,7 @@ class PokemonEditor:
         self.icon_shiny_lbl.pack(side=tk.LEFT)
         self.split_genders_btn.pack(side=tk.BOTTOM, fill=tk.BOTH)
         self.add_gigantamax_btn.pack(side=tk.BOTTOM, fill=tk.BOTH)
+        self.import_icons_btn.pack(side=tk.BOTTOM, fill=tk.BOTH)
 
         self._refresh_pokemon_list()
 
@@ -82,7 +93,7 @@ class PokemonEditor:
         self.pkmn_tree.delete(*self.pkmn_tree.get_children())
 
         # Populate Tree
-        for pokemon in self.db.get_pokemon():
+        for pokemon in self.db.get_all_pokemon():
             self.pkmn_tree.insert("", tk.END, values=pokemon)
 
     # Event Handlers
@@ -111,14 +122,36 @@ class PokemonEditor:
         filename: str = tk.filedialog.askopenfilename()
         if filename:
             image_blob: bytes = image_to_blob(filename)
-            self.db.update_icon_normal(self.cur_pokemon_id, image_blob)
+            self.db.update_portrait_icon(image_blob, self.cur_pokemon_id, False)
             self._on_pokemon_selected("event")
 
     def _on_icon_shiny_clicked(self, event) -> None:
         filename: str = tk.filedialog.askopenfilename()
         if filename:
             image_blob: bytes = image_to_blob(filename)
-            self.db.update_icon_shiny(self.cur_pokemon_id, image_blob)
+            self.db.update_portrait_icon(image_blob, self.cur_pokemon_id, True)
+            self._on_pokemon_selected("event")
+
+    # Import every <PokemonID>.png and <PokemonID>-shiny.png in a folder, showing progress in the title bar.
+    def _on_import_icons_clicked(self) -> None:
+        directory: str = askdirectory()
+        if not directory:
+            return
+
+        def show_progress(done: int, total: int) -> None:
+            self.root.title(f"{TITLE} - Importing icons {done}/{total}")
+            self.root.update_idletasks()
+
+        result: dict = import_icons(self.db, scan_directory(directory), show_progress)
+        self.root.title(TITLE)
+
+        summary: str = f"{result['imported']} imported, {result['skipped']} unchanged, {len(result['failed'])} failed"
+        if result["failed"]:
+            failures: str = "\n".join(f"{path}: {error}" for path, error in result["failed"][:MAX_LISTED_FAILURES])
+            showwarning("Import Icons", f"{summary}\n\n{failures}")
+        else:
+            showinfo("Import Icons", summary)
+        if self.pkmn_tree.focus():
             self._on_pokemon_selected("event")
 
     def _on_split_genders_clicked(self) -> None:
@@ -0,0 +1,61 @@
+# Window listing how a species' forms changed between games, from PokedexDB.get_species_history()
+
+# Python Libraries
+from tkinter import BOTH, END, LEFT, VERTICAL, Y, Misc, Toplevel
+from tkinter.ttk import Scrollbar, Treeview
+from typing import Optional
+
+# Global Declarations
+COLUMNS: dict = {
+    "Form": 110, "Games": 260, "Types": 120, "HP": 40, "ATK": 40, "DEF": 40, "SPA": 40, "SPD": 40, "SPE": 40,
+    "Abilities": 260
+}  # Column name -> width
+
+
+# Helper function to format one history row as tree values.
+def get_history_values(row: dict) -> tuple:
+    games: str = row["FirstGame"]
+    if row["LastGame"] != row["FirstGame"]:
+        games = f"{row['FirstGame']} – {row['LastGame']}"
+    types: str = "/".join(t for t in (row["PrimaryType"], row["SecondaryType"]) if t and t != "None")
+    abilities: list = [a for a in (row["PrimaryAbility"], row["SecondaryAbility"]) if a != "N/A"]
+    if row["HiddenAbility"] != "N/A":
+        abilities.append(f"{row['HiddenAbility']} (Hidden)")
+    return (
+        row["FormName"] or "Default",
+        games,
+        types,
+        *(row[stat] for stat in ("HP", "ATK", "DEF", "SPA", "SPD", "SPE")),
+        " / ".join(dict.fromkeys(abilities))
+    )
+
+
+class HistoryWindow:
+    def __init__(self, master: Misc) -> None:
+        self.master: Misc = master
+        self.window: Optional[Toplevel] = None
+        self.history_tree: Optional[Treeview] = None
+
+    # Show passed history rows under passed title, opening the window if it is not open.
+    def show(self, title: str, history: list) -> None:
+        if self.window is None or not self.window.winfo_exists():
+            self.create_window()
+        self.window.title(title)
+
+        # Repopulate tree
+        self.history_tree.delete(*self.history_tree.get_children())
+        for row in history:
+            self.history_tree.insert("", END, values=get_history_values(row))
+        self.window.lift()
+
+    def create_window(self) -> None:
+        self.window = Toplevel(self.master)
+        self.history_tree = Treeview(self.window, columns=list(COLUMNS), show="headings", height=15)
+        scrollbar: Scrollbar = Scrollbar(self.window, orient=VERTICAL, command=self.history_tree.yview)
+        self.history_tree.configure(yscrollcommand=scrollbar.set)
+        for col, width in COLUMNS.items():
+            self.history_tree.column(col, width=width, minwidth=width, stretch=col in ("Games", "Abilities"))
+            self.history_tree.heading(col, text=col)
+
+        self.history_tree.pack(side=LEFT, fill=BOTH, expand=True)
+        scrollbar.pack(side=LEFT, fill=Y)
@@ -0,0 +1,132 @@
+# LRU cache of decoded PhotoImages for portraits and type icons
+
+# Python Libraries
+from collections import OrderedDict
+from tkinter import PhotoImage
+from typing import Callable, Hashable
+
+# Local Libraries
+from DB.Instrumentation import timed
+
+# Global Declarations
+DEFAULT_BUDGET_BYTES: int = 64 * 1024 * 1024  # Approximate decoded RGBA bytes kept in memory
+
+
+# Cache key for a Pokémon portrait.
+def portrait_key(pokemon_id: int, shiny: bool) -> tuple:
+    return "portrait", pokemon_id, bool(shiny)
+
+
+# Cache key for a type icon.
+def type_icon_key(type_id: int) -> tuple:
+    return "type", type_id
+
+
+class ImageCache:
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES) -> None:
+        self.budget_bytes: int = budget_bytes
+        self.used_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        # Set when put_if_room() turns an image away, until an image is dropped to make room.
+        self._out_of_room: bool = False
+
+        # key -> (PhotoImage, approximate size in bytes), least recently used first
+        self._images: OrderedDict = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._images
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    # Return the decoded image for key, loading and decoding its bytes with load() on a miss.
+    def get(self, key: Hashable, load: Callable[[], bytes]) -> PhotoImage:
+        entry: tuple = self._images.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._images.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        return self.put(key, load())
+
+    # Decode passed image bytes (or a sprite pack slice) and store them under key, evicting older images
+    # if the cache goes over its budget.
+    @timed
+    def put(self, key: Hashable, icon_data: bytes) -> PhotoImage:
+        image, size = self.decode(icon_data)
+        self._store(key, image, size)
+        self._evict()
+        return image
+
+    # Decode passed image bytes and store them under key only if they fit in the remaining budget.
+    # Nothing is evicted: an image that does not fit is dropped, the cache counts as full and False is returned.
+    # Used for prefetched images, which must never push out images the user has already seen.
+    @timed
+    def put_if_room(self, key: Hashable, icon_data: bytes) -> bool:
+        image, size = self.decode(icon_data)
+        replaced: int = self._images[key][1] if key in self._images else 0
+        if self.used_bytes - replaced + size > self.budget_bytes:
+            self._out_of_room = True
+            return False
+        self._store(key, image, size)
+        return True
+
+    # Return passed image bytes (or a sprite pack slice) decoded, with the approximate decoded size in bytes.
+    def decode(self, icon_data: bytes) -> tuple:
+        if isinstance(icon_data, memoryview):
+            icon_data = icon_data.tobytes()
+        image: PhotoImage = PhotoImage(data=icon_data)
+        return image, image.width() * image.height() * 4
+
+    # Store a decoded image under key, replacing any image already stored there.
+    def _store(self, key: Hashable, image: PhotoImage, size: int) -> None:
+        self.discard(key)
+        self._images[key] = (image, size)
+        self.used_bytes += size
+
+    # Return the decoded portrait for a Pokémon, loading it with load(pokemon_id, shiny) on a miss.
+    def get_portrait(self, pokemon_id: int, shiny: bool, load: Callable[[int, bool], bytes]) -> PhotoImage:
+        return self.get(portrait_key(pokemon_id, shiny), lambda: load(pokemon_id, shiny))
+
+    # Return the decoded icon for a type, loading it with load(type_id) on a miss.
+    def get_type_icon(self, type_id: int, load: Callable[[int], bytes]) -> PhotoImage:
+        return self.get(type_icon_key(type_id), lambda: load(type_id))
+
+    # Drop a single image, e.g. after it was edited.
+    def discard(self, key: Hashable) -> None:
+        entry: tuple = self._images.pop(key, None)
+        if entry is not None:
+            self.used_bytes -= entry[1]
+            self._out_of_room = False
+
+    # Drop every image.
+    def clear(self) -> None:
+        self._images.clear()
+        self.used_bytes = 0
+        self._out_of_room = False
+
+    # Returns True once the cache has reached its byte budget, or turned an image away for lack of room.
+    def is_full(self) -> bool:
+        return self._out_of_room or self.used_bytes >= self.budget_bytes
+
+    # Return a dict of cache counters.
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._images),
+            "used_bytes": self.used_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    # Evict least recently used images until the cache fits its budget (the newest image is always kept).
+    def _evict(self) -> None:
+        while self.used_bytes > self.budget_bytes and len(self._images) > 1:
+            _, (_, size) = self._images.popitem(last=False)
+            self.used_bytes -= size
+            self.evictions += 1
@@ -0,0 +1,52 @@
+# Warms the image cache with the neighbours of the selected Pokémon
+
+# Python Libraries
+from typing import Callable
+
+# Local Libraries
+from DB.DexSnapshot import DexSnapshot
+from UI.DBWorker import DBWorker
+from UI.ImageCache import ImageCache, portrait_key, type_icon_key
+
+# Global Declarations
+DEFAULT_WINDOW: int = 5  # Pokémon prefetched on each side of the selection
+
+
+class Prefetcher:
+    def __init__(self, worker: DBWorker, image_cache: ImageCache, fetch: Callable[[list], dict],
+                 window: int = DEFAULT_WINDOW) -> None:
+        self.worker: DBWorker = worker
+        self.image_cache: ImageCache = image_cache
+        self.window: int = window
+
+        # fetch(keys) returns a dict of icon bytes for passed cache keys, and runs on the worker thread.
+        self._fetch: Callable[[list], dict] = fetch
+
+    # Queue normal and shiny portraits and type icons of every form of the passed Pokémon.
+    # Forms, stats and abilities already live in the snapshot, so only icons need warming.
+    def prefetch(self, snapshot: DexSnapshot, national_dex_ids: list) -> None:
+        if not self.window or self.image_cache.is_full():
+            self.worker.cancel("prefetch")
+            return
+
+        keys: list = []
+        for national_dex_id in national_dex_ids:
+            for pokemon_id, _ in snapshot.get_forms(national_dex_id):
+                keys.append(portrait_key(pokemon_id, False))
+                keys.append(portrait_key(pokemon_id, True))
+                type_ids: tuple = snapshot.get_type_ids(snapshot.get_header(pokemon_id)[0]) or ()
+                keys.extend(type_icon_key(type_id) for type_id in type_ids)
+
+        # Nearest neighbours come first, so keep that order while dropping duplicates and cached keys.
+        missing: list = [key for key in dict.fromkeys(keys) if key not in self.image_cache]
+        if missing:
+            self.worker.submit("prefetch", self._fetch, missing, callback=self.on_prefetched, debounce=True)
+        else:
+            self.worker.cancel("prefetch")
+
+    # Decode prefetched icons into the cache, stopping at the first one that does not fit, so nothing
+    # useful is evicted.
+    def on_prefetched(self, icons: dict) -> None:
+        for key, icon_data in icons.items():
+            if key not in self.image_cache and not self.image_cache.put_if_room(key, icon_data):
+                break
@@ -0,0 +1,60 @@
+# Incremental search index over the Pokémon selector rows
+
+# Global Declarations
+NGRAM_SIZE: int = 3  # Length of the substrings indexed for each name
+
+
+class PokemonSearchIndex:
+    def __init__(self) -> None:
+        # Lowercased names, indexed like the selector rows they were built from.
+        self.names: list = []
+
+        # Dex number (as typed) -> row indexes, and n-gram -> set of row indexes.
+        self.dex_numbers: dict = {}
+        self.ngrams: dict = {}
+
+        # Last searched term and its name matches, narrowed when the term is extended.
+        self._last_term: str = ""
+        self._last_matches: list = []
+
+    # Rebuild the index from passed selector rows: (NationalDexID, DexOrder, PokemonName).
+    def build(self, pokemon: list) -> None:
+        self.names = [values[2].lower() for values in pokemon]
+        self.dex_numbers = {}
+        self.ngrams = {}
+        for index, values in enumerate(pokemon):
+            self.dex_numbers.setdefault(str(values[1]), []).append(index)
+            name: str = self.names[index]
+            for start in range(len(name) - NGRAM_SIZE + 1):
+                self.ngrams.setdefault(name[start:start + NGRAM_SIZE], set()).add(index)
+        self._last_term = ""
+        self._last_matches = list(range(len(self.names)))
+
+    # Return indexes of rows whose name contains term, or whose dex number equals term, in row order.
+    def search(self, term: str) -> list:
+        matches: list = self._search_names(term)
+        dex_matches: list = self.dex_numbers.get(term, [])
+        if dex_matches:
+            matches = sorted(set(matches).union(dex_matches))
+        return matches
+
+    def _search_names(self, term: str) -> list:
+        if not term:
+            candidates = range(len(self.names))
+        elif self._last_term and self._last_term in term:
+            # Every match for the extended term also matched the previous term.
+            candidates = self._last_matches
+        elif len(term) >= NGRAM_SIZE:
+            grams: list = sorted(
+                (self.ngrams.get(term[start:start + NGRAM_SIZE], set())
+                 for start in range(len(term) - NGRAM_SIZE + 1)),
+                key=len
+            )
+            candidates = sorted(grams[0].intersection(*grams[1:]))
+        else:
+            candidates = range(len(self.names))
+
+        matches: list = [index for index in candidates if term in self.names[index]]
+        self._last_term = term
+        self._last_matches = matches
+        return matches
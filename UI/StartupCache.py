@@ -0,0 +1,42 @@
+# Small JSON cache of the last session's selection, so the viewer can show a Pokémon list before the database answers
+
+# Python Libraries
+import json
+from os import replace
+from os.path import abspath
+from typing import Optional
+
+# Global Declarations
+CACHE_VERSION: int = 1  # Bump when the cached layout changes; older caches are ignored
+
+
+# Return the cached selection ({"game", "dex", "games", "pokemon"}) for database, or None if there is no usable cache.
+def load_startup_cache(path: str, database: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as cache_file:
+            cache: dict = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if cache.get("version") != CACHE_VERSION or cache.get("database") != abspath(database):
+        return None
+    if not cache.get("games") or cache.get("game") not in cache["games"]:
+        return None
+    return cache
+
+
+# Save the current selection and its Pokémon list, replacing the file atomically. Failures are ignored.
+def save_startup_cache(path: str, database: str, game: str, dex: str, games: list, pokemon: list) -> None:
+    cache: dict = {
+        "version": CACHE_VERSION,
+        "database": abspath(database),
+        "game": game,
+        "dex": dex,
+        "games": games,
+        "pokemon": [list(values) for values in pokemon]
+    }
+    try:
+        with open(f"{path}.tmp", "w", encoding="utf-8") as cache_file:
+            json.dump(cache, cache_file, ensure_ascii=False)
+        replace(f"{path}.tmp", path)
+    except OSError:
+        pass
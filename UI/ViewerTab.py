@@ -1,26 +1,38 @@
 from tkinter import StringVar, END, VERTICAL, PhotoImage, LEFT, TOP, X, Y, BOTH, IntVar, HORIZONTAL
-from tkinter.ttk import Frame, Label, Progressbar, Treeview, Scrollbar, Entry, OptionMenu, Style, Separator, Checkbutton
-from typing import Optional
-
-
-# Helper function to sort treeview by Pokédex no.
-def sort_pokemon_by_dex_no(tree, col, descending) -> None:
-    data: list = [(int(tree.set(item, col)), item) for item in tree.get_children("")]
-    data.sort(reverse=descending)
-    for index, (val, item) in enumerate(data):
-        tree.move(item, "", index)
-    tree.heading(col, command=lambda: sort_pokemon_by_dex_no(tree, col, not descending))
-    tree.heading("PokemonName", command=lambda: sort_pokemon_by_name(tree, "PokemonName", False))
-
-
-# Helper function to sort treeview by Pokémon name.
-def sort_pokemon_by_name(tree, col, descending) -> None:
-    data: list = [(tree.set(item, col), item) for item in tree.get_children("")]
-    data.sort(reverse=descending)
-    for index, (val, item) in enumerate(data):
-        tree.move(item, "", index)
-    tree.heading(col, command=lambda: sort_pokemon_by_name(tree, col, not descending))
-    tree.heading("NationalDexNo", command=lambda: sort_pokemon_by_dex_no(tree, "NationalDexNo", False))
+from tkinter.ttk import Button, Frame, Label, Progressbar, Treeview, Entry, OptionMenu, Style, Separator, Checkbutton
+from typing import Callable, Optional
+
+# Local Libraries
+from DB.Instrumentation import timed
+from UI.SearchIndex import PokemonSearchIndex
+from UI.VirtualList import VirtualList
+
+# Global Declarations
+FULL_TEXT_MIN_LENGTH: int = 3  # Shortest search term also sent to full_text_search
+MULTIPLIER_TEXT: dict = {4.0: "×4", 2.0: "×2", 0.5: "×½", 0.25: "×¼"}  # Type matchup multipliers as shown
+STAT_LEVELS: dict = {"Base stats": 0, "Lv. 50": 50, "Lv. 100": 100}  # Stat display choices; 0 shows base stats
+
+
+# Helper function to precompute each row's position in the Pokémon tree when sorted by each column.
+def get_sort_ranks(pokemon: list) -> dict:
+    sort_keys: dict = {
+        "NationalDexNo": lambda index: (int(pokemon[index][1]), index),
+        "PokemonName": lambda index: (pokemon[index][2], index)
+    }
+    sort_ranks: dict = {}
+    for col, sort_key in sort_keys.items():
+        ranks: list = [0] * len(pokemon)
+        for rank, index in enumerate(sorted(range(len(pokemon)), key=sort_key)):
+            ranks[index] = rank
+        sort_ranks[col] = ranks
+    return sort_ranks
+
+
+# Helper function to format a rank as an ordinal number (1st, 2nd, 12th, ...).
+def ordinal(number: int) -> str:
+    if 10 <= number % 100 <= 20:
+        return f"{number}th"
+    return f"{number}{({1: 'st', 2: 'nd', 3: 'rd'}).get(number % 10, 'th')}"
 
 
 # Focus first item of passed TreeView object
@@ -64,9 +76,9 @@ class ViewerTab:
         self.dex_selector: Optional[OptionMenu] = None
         self.search_var: StringVar = StringVar()
         self.search_bar: Optional[Entry] = None
-        self.pokemon_tree: Optional[Treeview] = None
-        self.pokemon_tree_scrollbar: Optional[Scrollbar] = None
+        self.pokemon_tree: Optional[VirtualList] = None
         self.form_tree: Optional[Treeview] = None
+        self.history_btn: Optional[Button] = None
 
         # Control headers (Data Subframe [Portrait Group])
         self.portrait_icon: Optional[PhotoImage] = None
@@ -79,10 +91,15 @@ class ViewerTab:
         self.primary_type_icon_lbl: Optional[Label] = None
         self.secondary_type_icon: Optional[PhotoImage] = None
         self.secondary_type_icon_lbl: Optional[Label] = None
+        self.matchups_lbl: Optional[Label] = None
 
         # Control headers (Data Subframe [Stats Group])
         self.stat_value_labels: list = []
         self.stat_bars: list = []
+        self.stat_rank_labels: list = []
+        self.total_value_lbl: Optional[Label] = None
+        self.stat_level_var: StringVar = StringVar()
+        self.stat_level_selector: Optional[OptionMenu] = None
 
         # Control headers (Data Subframe [Ability Group])
         self.primary_ability_lbl: Optional[Label] = None
@@ -92,8 +109,21 @@ class ViewerTab:
         self.secondary_ability: Optional[Label] = None
         self.hidden_ability: Optional[Label] = None
 
-        # List to store passed Pokémon data.
+        # List to store passed Pokémon data, and the row indexes shown in the Pokémon list.
         self.selector_data: list = []
+        self.search_index: PokemonSearchIndex = PokemonSearchIndex()
+        self.visible_items: list = []
+        self.national_dex_rows: dict = {}
+
+        # Optional callable that looks up national dex IDs matching a term by form or ability name in the
+        # background, then passes them to the callback it was given. Results of older searches are dropped.
+        self.full_text_search: Optional[Callable[[str, Callable[[list], None]], None]] = None
+        self.search_generation: int = 0
+
+        # Pokémon tree sort state, with sort ranks precomputed per dex load.
+        self.sort_ranks: dict = {}
+        self.sort_column: Optional[str] = None
+        self.sort_descending: bool = False
         self.max_stats: tuple = (0, 0)
 
         # Create widgets.
@@ -111,18 +141,11 @@ class ViewerTab:
         self.game_selector = OptionMenu(self.selection_subframe, self.game_var)
         self.dex_selector = OptionMenu(self.selection_subframe, self.dex_var)
         self.search_bar = Entry(self.selection_subframe, textvariable=self.search_var, foreground="gray")
-        self.pokemon_tree = Treeview(
+        self.pokemon_tree = VirtualList(
             self.pokemon_tree_group,
             columns=["PokemonID", "NationalDexNo", "PokemonName"],
             displaycolumns=["NationalDexNo", "PokemonName"],
-            show="headings",
             height=12
-
-        )
-        self.pokemon_tree_scrollbar: Scrollbar = Scrollbar(
-            self.pokemon_tree_group,
-            orient=VERTICAL,
-            command=self.pokemon_tree.yview
         )
         self.form_tree = Treeview(
             self.selection_subframe,
@@ -132,6 +155,8 @@ class ViewerTab:
             height=5
         )
 
+        self.history_btn = Button(self.selection_subframe, text="History Across Games")
+
         # Control configurations
         self.search_bar.insert(0, "Search...")
         self.search_bar.bind("<FocusIn>", self.on_search_bar_focus_in)
@@ -142,15 +167,14 @@ class ViewerTab:
         self.pokemon_tree.heading(
             "NationalDexNo",
             text="#",
-            command=lambda col="NationalDexNo": sort_pokemon_by_dex_no(self.pokemon_tree, col, True)
+            command=lambda col="NationalDexNo": self.sort_pokemon_tree(col, True)
         )
         self.pokemon_tree.heading(
             "PokemonName",
             text="Pokemon",
-            command=lambda col="PokemonName": sort_pokemon_by_name(self.pokemon_tree, col, False)
+            command=lambda col="PokemonName": self.sort_pokemon_tree(col, False)
 
         )
-        self.pokemon_tree.configure(yscrollcommand=self.pokemon_tree_scrollbar.set)
         self.form_tree.column("FormName")
         self.form_tree.heading("FormName", text="Form")
 
@@ -161,10 +185,10 @@ class ViewerTab:
         Separator(self.selection_subframe, orient=HORIZONTAL).pack(side=TOP, pady=10)
         self.search_bar.pack(side=TOP, fill=X)
         self.pokemon_tree.pack(side=LEFT, fill=BOTH)
-        self.pokemon_tree_scrollbar.pack(side=LEFT, fill=Y)
         self.pokemon_tree_group.pack(side=TOP, fill=X)
         Separator(self.selection_subframe, orient=HORIZONTAL).pack(side=TOP, pady=10)
         self.form_tree.pack(side=TOP, fill=X)
+        self.history_btn.pack(side=TOP, fill=X, pady=(5, 0))
 
         # Place Subframe
         self.selection_subframe.pack(side=LEFT, fill=Y)
@@ -188,6 +212,8 @@ class ViewerTab:
         self.primary_type_icon_lbl.grid(column=0, row=0)
         self.secondary_type_icon_lbl = Label(self.type_group)
         self.secondary_type_icon_lbl.grid(column=1, row=0)
+        self.matchups_lbl = Label(self.type_group, wraplength=400, justify=LEFT)
+        self.matchups_lbl.grid(column=0, row=1, columnspan=2)
 
         # Control declarations (Stats Group)
         labels: list = ["HP", "ATK", "DEF", "SPA", "SPD", "SPE"]
@@ -210,6 +236,28 @@ class ViewerTab:
             stat_bar.grid(column=4, row=i, pady=2, padx=(0, 10))
             self.stat_bars.append(stat_bar)
 
+            # Stat ranks within the dex
+            stat_rank_label: Label = Label(self.stats_group, width=11, foreground="gray")
+            stat_rank_label.grid(column=5, row=i)
+            self.stat_rank_labels.append(stat_rank_label)
+
+        # Base stat total
+        Label(self.stats_group, text="BST", width=5).grid(column=0, row=len(labels))
+        self.total_value_lbl = Label(self.stats_group, text=0, width=5)
+        self.total_value_lbl.grid(column=1, row=len(labels))
+        total_rank_label: Label = Label(self.stats_group, width=11, foreground="gray")
+        total_rank_label.grid(column=5, row=len(labels))
+        self.stat_rank_labels.append(total_rank_label)
+
+        # Base stats, or actual stats at a level
+        self.stat_level_selector = OptionMenu(
+            self.stats_group,
+            self.stat_level_var,
+            next(iter(STAT_LEVELS)),
+            *STAT_LEVELS
+        )
+        self.stat_level_selector.grid(column=4, row=len(labels), pady=2)
+
         # Control declarations (Ability Group)
         self.primary_ability_lbl = Label(self.ability_group, width=10, text="Ability 1")
         self.secondary_ability_lbl = Label(self.ability_group, width=10, text="Ability 2")
@@ -237,40 +285,48 @@ class ViewerTab:
         # Place Subframe.
         self.data_subframe.pack(side=TOP)
 
-    # Refresh self.game_selector data with passed list.
-    def refresh_games(self, games: list) -> None:
+    # Refresh self.game_selector data with passed list, selecting passed game if listed (else the first).
+    @timed
+    def refresh_games(self, games: list, selected: Optional[str] = None) -> None:
         self.game_selector["menu"].delete(0, END)
         if games:
             for game in games:
                 self.game_selector["menu"].add_command(label=game, command=lambda g=game: self.game_var.set(g))
-            self.game_var.set(games[0])
+            self.game_var.set(selected if selected in games else games[0])
 
-    # Refresh self.dex_selector data with passed list.
-    def refresh_dexes(self, dexes: list) -> None:
+    # Refresh self.dex_selector data with passed list, selecting passed dex if listed (else the first).
+    @timed
+    def refresh_dexes(self, dexes: list, selected: Optional[str] = None) -> None:
         self.dex_selector["menu"].delete(0, END)
         if dexes:
             for dex in dexes:
                 self.dex_selector["menu"].add_command(label=dex, command=lambda d=dex: self.dex_var.set(d))
-            self.dex_var.set(dexes[0])
+            self.dex_var.set(selected if selected in dexes else dexes[0])
         else:
             self.dex_var.set("None")
 
     # Flushes Pokémon values, and replaces them with the passed Pokémon data.
+    @timed
     def refresh_pokemon_tree(self, pokemon: list) -> None:
         # Store passed data
         self.selector_data = pokemon
 
-        # Delete items from tree
-        self.pokemon_tree.delete(*self.pokemon_tree.get_children())
-
-        # Populate Tree
-        for values in self.selector_data:
-            self.pokemon_tree.insert("", END, values=values)
+        # Hand the rows to the list, which only renders the visible ones
+        self.pokemon_tree.set_data(self.selector_data)
+        self.visible_items = list(range(len(self.selector_data)))
+        self.search_index.build(self.selector_data)
+        self.national_dex_rows = {}
+        for index, values in enumerate(self.selector_data):
+            self.national_dex_rows.setdefault(values[0], []).append(index)
+        self.sort_ranks = get_sort_ranks(self.selector_data)
+        self.search_generation += 1
+        self.show_pokemon_items(self.sort_indices(range(len(self.selector_data))))
 
         self.on_search_var_changed()
-        focus_first(self.pokemon_tree)
+        self.pokemon_tree.select(0)
 
     # Flushes form values, and replaces them with the passed Pokémon form data.
+    @timed
     def refresh_form_tree(self, forms: list) -> None:
         # Delete items from tree
         self.form_tree.delete(*self.form_tree.get_children())
@@ -283,22 +339,40 @@ class ViewerTab:
                 self.form_tree.insert("", END, values=(form[0], "Default"))
         focus_first(self.form_tree)
 
-    # Set portrait icon from passed binary data.
-    def refresh_portrait_icon(self, icon_data: bytes) -> None:
-        self.portrait_icon = PhotoImage(data=icon_data)
+    # Set portrait icon from passed decoded image.
+    @timed
+    def refresh_portrait_icon(self, icon: PhotoImage) -> None:
+        self.portrait_icon = icon
         self.portrait_icon_lbl.config(image=self.portrait_icon)
 
-    # Set type icons from passed tuple of binary data.
+    # Set type icons from passed tuple of decoded images.
+    @timed
     def refresh_type_icons(self, type_icons: tuple) -> None:
         # Refresh primary type
-        self.primary_type_icon = PhotoImage(data=type_icons[0])
+        self.primary_type_icon = type_icons[0]
         self.primary_type_icon_lbl.config(image=self.primary_type_icon)
 
         # Refresh secondary type
-        self.secondary_type_icon = PhotoImage(data=type_icons[1])
+        self.secondary_type_icon = type_icons[1]
         self.secondary_type_icon_lbl.config(image=self.secondary_type_icon)
 
+    # Set type matchup text from passed dict of {attacking type: multiplier}.
+    @timed
+    def refresh_matchups(self, matchups: dict) -> None:
+        weak: list = sorted((m for m in matchups.items() if m[1] > 1.0), key=lambda m: -m[1])
+        resists: list = sorted((m for m in matchups.items() if 0.0 < m[1] < 1.0), key=lambda m: m[1])
+        immune: list = [type_name for type_name, multiplier in matchups.items() if multiplier == 0.0]
+        lines: list = []
+        if weak:
+            lines.append("Weak: " + ", ".join(f"{t} {MULTIPLIER_TEXT.get(m, m)}" for t, m in weak))
+        if resists:
+            lines.append("Resists: " + ", ".join(f"{t} {MULTIPLIER_TEXT.get(m, m)}" for t, m in resists))
+        if immune:
+            lines.append("Immune: " + ", ".join(immune))
+        self.matchups_lbl.configure(text="\n".join(lines))
+
     # Set stat bar data to passed list of stats.
+    @timed
     def refresh_stats(self, stats: list) -> None:
         first_quarter: int = int(self.max_stats[1] / 4)
         second_quarter: int = first_quarter * 2
@@ -326,32 +400,94 @@ class ViewerTab:
                 stat_bar["style"] = "green.Horizontal.TProgressbar"
             else:
                 stat_bar["style"] = "blue.Horizontal.TProgressbar"
+        self.total_value_lbl.configure(text=sum(stats))
+
+    # Set stat rank labels from passed list of (rank, count) tuples (or None), one per stat then the total.
+    @timed
+    def refresh_stat_ranks(self, ranks: list) -> None:
+        for stat_rank_label, rank in zip(self.stat_rank_labels, ranks):
+            stat_rank_label.configure(text=f"{ordinal(rank[0])} of {rank[1]}" if rank else "")
 
+    @timed
     def refresh_max_stats(self, max_stats: tuple) -> None:
         self.max_stats = max_stats
 
+    @timed
     def refresh_abilities(self, abilities: tuple) -> None:
         self.primary_ability.configure(text=abilities[0])
         self.secondary_ability.configure(text=abilities[1])
         self.hidden_ability.configure(text=abilities[2])
 
-    # Search Pokémon in selector by either name or dex number.
+    # Search Pokémon in selector by either name or dex number. Matches by form or ability name are added
+    # once the full-text search returns.
     def search_pokemon_tree(self, term: str) -> None:
-        self.pokemon_tree.delete(*self.pokemon_tree.get_children())
-        for values in self.selector_data:
-            if term in values[2].lower() or term == str(values[1]):
-                self.pokemon_tree.insert("", END, values=values)
-        focus_first(self.pokemon_tree)
+        self.search_generation += 1
+        indices: list = self.search_index.search(term)
+        if self.show_pokemon_items(self.sort_indices(indices)):
+            self.pokemon_tree.select(0)
+        if self.full_text_search is not None and len(term) >= FULL_TEXT_MIN_LENGTH:
+            generation: int = self.search_generation
+            self.full_text_search(
+                term, lambda national_dex_ids: self.add_full_text_matches(generation, indices, national_dex_ids)
+            )
+
+    # Add the rows of passed national dex IDs to the search results (indices) they were looked up for,
+    # unless a newer search or dex load has replaced those results.
+    def add_full_text_matches(self, generation: int, indices: list, national_dex_ids: list) -> None:
+        if generation != self.search_generation:
+            return
+        matches: set = set(indices)
+        for national_dex_id in national_dex_ids:
+            matches.update(self.national_dex_rows.get(national_dex_id, ()))
+        if self.show_pokemon_items(self.sort_indices(sorted(matches))) and self.pokemon_tree.get_selected() is None:
+            self.pokemon_tree.select(0)
+
+    # Sort Pokémon tree by passed column, keeping the active search filter.
+    def sort_pokemon_tree(self, col: str, descending: bool) -> None:
+        self.sort_column = col
+        self.sort_descending = descending
+        self.show_pokemon_items(self.sort_indices(self.visible_items))
+
+        other_col: str = "PokemonName" if col == "NationalDexNo" else "NationalDexNo"
+        self.pokemon_tree.heading(col, command=lambda: self.sort_pokemon_tree(col, not descending))
+        self.pokemon_tree.heading(other_col, command=lambda: self.sort_pokemon_tree(other_col, False))
+
+    # Return passed selector row indexes in the current sort order.
+    def sort_indices(self, indices) -> list:
+        if self.sort_column is None:
+            return list(indices)
+        ranks: list = self.sort_ranks[self.sort_column]
+        return sorted(indices, key=ranks.__getitem__, reverse=self.sort_descending)
+
+    # Show only the passed selector rows, in order. Returns True if the list changed.
+    def show_pokemon_items(self, indices: list) -> bool:
+        if indices == self.visible_items:
+            return False
+        self.pokemon_tree.set_order(indices)
+        self.visible_items = indices
+        return True
 
     # Returns national dex ID of current selection.
     def get_national_dex_id(self) -> int:
-        pokemon: str = self.pokemon_tree.focus()
-        if pokemon:
-            national_dex_id: int = int(self.pokemon_tree.item(pokemon)["values"][0])
+        pokemon: Optional[int] = self.pokemon_tree.get_selected()
+        if pokemon is not None:
+            national_dex_id: int = self.selector_data[pokemon][0]
         else:
             national_dex_id: int = 0
         return national_dex_id
 
+    # Returns national dex IDs of up to count visible rows on each side of the selection, nearest first.
+    def get_neighbor_national_dex_ids(self, count: int) -> list:
+        index: Optional[int] = self.pokemon_tree.selected
+        if index is None or not count:
+            return []
+        neighbors: list = []
+        for offset in range(1, count + 1):
+            for neighbor in (index + offset, index - offset):
+                if 0 <= neighbor < len(self.visible_items):
+                    neighbors.append(self.selector_data[self.visible_items[neighbor]][0])
+        return neighbors
+
     # Returns Pokémon ID of current selection.
     def get_pokemon_id(self) -> int:
         pokemon: str = self.form_tree.focus()
@@ -361,6 +497,10 @@ class ViewerTab:
             pokemon_id: int = 0
         return pokemon_id
 
+    # Returns level of the stats to show, or 0 for base stats.
+    def get_stat_level(self) -> int:
+        return STAT_LEVELS.get(self.stat_level_var.get(), 0)
+
     # Returns game name for current selection.
     def get_game(self) -> str:
         game: str = self.game_var.get()
@@ -0,0 +1,141 @@
+# Virtualized list: a fixed number of Treeview rows showing a window onto a Python row model
+
+# Python Libraries
+from tkinter import END, LEFT, VERTICAL, BOTH, Y, Event, Misc
+from tkinter.ttk import Frame, Scrollbar, Treeview
+from typing import Optional
+
+# Global Declarations
+WHEEL_ROWS: int = 3  # Rows scrolled per mouse wheel notch
+
+
+class VirtualList(Frame):
+    # Rows are sequences of column values. Only height Treeview items ever exist; scrolling rewrites
+    # their values instead of inserting items, so replacing the data costs the same for any number of rows.
+    # Selecting a row generates <<TreeviewSelect>> on this widget, like a Treeview.
+    def __init__(self, master: Misc, columns: list, displaycolumns: list, height: int) -> None:
+        super().__init__(master)
+        self.height: int = height
+
+        # Row model, the data indexes shown in display order, the first shown position and the selected position.
+        self.data: list = []
+        self.order: list = []
+        self.top: int = 0
+        self.selected: Optional[int] = None
+
+        self.tree: Treeview = Treeview(
+            self,
+            columns=columns,
+            displaycolumns=displaycolumns,
+            show="headings",
+            height=height,
+            selectmode="browse"
+        )
+        self.scrollbar: Scrollbar = Scrollbar(self, orient=VERTICAL, command=self.yview)
+
+        # One item per visible row, identified by its slot number.
+        self.slots: list = [self.tree.insert("", END, iid=str(slot)) for slot in range(height)]
+
+        # Keyboard, mouse and wheel input act on the model rather than the Treeview's own items.
+        self.tree.bind("<Button-1>", self.on_click)
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.move_selection(-self.height))
+        self.tree.bind("<Next>", lambda event: self.move_selection(self.height))
+        self.tree.bind("<Home>", lambda event: self.select(0))
+        self.tree.bind("<End>", lambda event: self.select(len(self.order) - 1))
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(WHEEL_ROWS))
+
+        self.tree.pack(side=LEFT, fill=BOTH)
+        self.scrollbar.pack(side=LEFT, fill=Y)
+        self.render()
+
+    def column(self, col: str, **kwargs) -> None:
+        self.tree.column(col, **kwargs)
+
+    def heading(self, col: str, **kwargs) -> None:
+        self.tree.heading(col, **kwargs)
+
+    # Replace the row model. Shows rows in data order until set_order() is called.
+    def set_data(self, data: list) -> None:
+        self.data = data
+        self.order = list(range(len(data)))
+        self.top = 0
+        self.selected = None
+        self.render()
+
+    # Show only the passed data indexes, in order, keeping the selected row selected if it is still shown.
+    def set_order(self, order: list) -> None:
+        selected_index: Optional[int] = self.get_selected()
+        self.order = order
+        self.selected = None
+        if selected_index is not None and selected_index in order:
+            self.selected = order.index(selected_index)
+        self.top = max(0, min(self.top, len(self.order) - self.height))
+        self.render()
+
+    # Return the data index of the selected row, or None.
+    def get_selected(self) -> Optional[int]:
+        if self.selected is None:
+            return None
+        return self.order[self.selected]
+
+    # Select the row at passed position (clamped to the shown rows), scroll it into view and
+    # generate <<TreeviewSelect>>.
+    def select(self, position: int) -> str:
+        if self.order:
+            self.selected = max(0, min(position, len(self.order) - 1))
+            if self.selected < self.top:
+                self.top = self.selected
+            elif self.selected >= self.top + self.height:
+                self.top = self.selected - self.height + 1
+            self.render()
+            self.event_generate("<<TreeviewSelect>>", when="tail")
+        return "break"
+
+    def move_selection(self, offset: int) -> str:
+        return self.select(offset if self.selected is None else self.selected + offset)
+
+    # Scroll by passed number of rows without changing the selection.
+    def scroll(self, rows: int) -> str:
+        self.top = max(0, min(self.top + rows, len(self.order) - self.height))
+        self.render()
+        return "break"
+
+    # Scrollbar command: ("moveto", fraction) or ("scroll", count, "units"/"pages").
+    def yview(self, *args) -> None:
+        if args[0] == "moveto":
+            self.top = max(0, min(round(float(args[1]) * len(self.order)), len(self.order) - self.height))
+            self.render()
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]) * (self.height if args[2] == "pages" else 1))
+
+    # Select the clicked row. Clicks on headings and column separators are left to the Treeview's class
+    # binding, so heading commands (sorting) and column resizing still work.
+    def on_click(self, event: Event) -> Optional[str]:
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None
+        self.tree.focus_set()
+        slot: str = self.tree.identify_row(event.y)
+        if slot:
+            self.select(self.top + int(slot))
+        return "break"
+
+    # Write the rows at the current scroll position into the slots, and update the selection and scrollbar.
+    def render(self) -> None:
+        shown: int = max(0, min(self.height, len(self.order) - self.top))
+        for slot in range(shown):
+            self.tree.item(self.slots[slot], values=self.data[self.order[self.top + slot]])
+        self.tree.set_children("", *self.slots[:shown])
+
+        if self.selected is not None and self.top <= self.selected < self.top + shown:
+            self.tree.selection_set(self.slots[self.selected - self.top])
+        else:
+            self.tree.selection_set(())
+
+        if self.order:
+            self.scrollbar.set(self.top / len(self.order), (self.top + shown) / len(self.order))
+        else:
+            self.scrollbar.set(0, 1)